@@ -1,6 +1,5 @@
 # https://pokerkit.readthedocs.io/en/stable/
 
-from pokerkit import *
 from static import card_dict, card_toNum, ranks, suits
 from collections import Counter
 from collections import defaultdict
@@ -9,6 +8,15 @@ import itertools
 # card_dict: int -> str
 # card_toNum: str -> int
 
+
+def parse_range(*args, **kwargs):
+    """
+    pokerkit's parse_range, imported on first use
+    (pokerkit is slow to import and the engine itself doesn't need it)
+    """
+    from pokerkit import parse_range as pokerkit_parse_range
+    return pokerkit_parse_range(*args, **kwargs)
+
 ''' Building Range: Set of hands'''
 
 def ppairs(floor):
@@ -0,0 +1,359 @@
+'''
+Batch evaluation of many spots from the command line
+
+Reads spots (hero hand, flop, villain range) as a stream of JSONL or CSV
+from a file or stdin, evaluates them with main_function on a process pool and
+writes one result per spot, in input order, as soon as it's ready.
+
+Input (JSONL, one object per line, or CSV with a header row):
+
+    {"id": "s1", "hand": "AdQc", "flop": "QdTd5c", "range": "QQ+,AKs,T9s"}
+
+"flop" can also be a turn or river board ("QdTd5c2s"), then results only
+have the turn/river streets (flop columns are left empty in CSV).
+"id" is optional (defaults to the line number), "range" uses pokerkit's range
+notation. Spots are checked with is_valid_hand/is_valid_flop (+ overlapping
+cards); invalid spots get an "error" instead of results.
+
+    python batch.py spots.jsonl -o results.jsonl --workers 8
+    cat spots.csv | python batch.py --format csv > results.jsonl
+
+Only a bounded window of spots is in flight at once, so memory stays flat
+no matter how big the input is. A throughput summary goes to stderr at the end.
+
+    python batch.py spots.jsonl --method sample --target-error 0.002 --seed 1
+
+estimates from random runouts (see sampling_engine.py) and adds the sample
+count and achieved error to each result.
+
+    python batch.py spots.jsonl -o results.jsonl --profile batch.folded
+
+times every engine stage (serially) and writes flamegraph collapsed stacks
+(see profiling.py), with a per-stage table on stderr.
+'''
+
+from poker_engine import *
+from atom_funcs import get_cards_str
+from profiling import profile
+from collections import Counter, deque
+from functools import lru_cache
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+streets = ['flop', 'turn', 'river']
+hand_types = [hand_type_dict[i] for i in range(9)]
+
+spots_per_task = 16
+tasks_per_worker = 4
+
+
+""" --- Input --- """
+
+def read_spots(f, fmt):
+    """
+    Args:
+        f: text file object
+        fmt (str): 'jsonl' or 'csv'
+
+    Yields:
+        dict: one spot (id, hand, flop, range), or with 'error' if the line can't be read
+    """
+    if fmt == 'csv':
+        rows = enumerate(csv.DictReader(f), start = 1)
+    else:
+        rows = ((i, line) for i, line in enumerate(f, start = 1) if line.strip())
+
+    for i, row in rows:
+        if fmt != 'csv':
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                yield {'id': i, 'error': f'Invalid JSON: {e}'}
+                continue
+
+            if not isinstance(row, dict):
+                yield {'id': i, 'error': 'Expected a JSON object'}
+                continue
+
+        # blank ids (e.g. an empty CSV cell) fall back to the line number, like missing ones
+        spot_id = row.get('id')
+        if spot_id is None or (isinstance(spot_id, str) and not spot_id.strip()):
+            spot_id = i
+
+        # non-string fields (e.g. "hand": 123) fail validation in spot_error, like the server
+        yield {'id': spot_id,
+               'hand': str(row.get('hand') or '').strip(),
+               'flop': str(row.get('flop') or '').strip(),
+               'range': str(row.get('range') or '').strip()}
+
+
+def spot_error(spot):
+    """
+    Same checks as the GUI's validity_command
+
+    Returns:
+        str: error message, or None if the spot is valid
+    """
+    if 'error' in spot:
+        return spot['error']
+
+    hand_valid, hand_error_msg = is_valid_hand(spot['hand'])
+    if not hand_valid:
+        return hand_error_msg
+
+    flop_valid, flop_error_msg = is_valid_flop(spot['flop'])
+    if not flop_valid:
+        return flop_error_msg
+
+    card_counts = Counter(get_cards_str(spot['hand'] + spot['flop']))
+    duplicated_cards = [card for card, v in card_counts.items() if v > 1]
+    if duplicated_cards:
+        return f'Overlapping cards: {duplicated_cards}'
+
+    if not spot['range']:
+        return 'Please add cards to range'
+
+    return None
+
+
+""" --- Evaluation (runs in workers) --- """
+
+@lru_cache(maxsize = 1024)
+def parse_range_str(range_str):
+    """Range strings repeat a lot across spots, so parse each once per worker"""
+    return Range.from_str(range_str)
+
+
+worker_store = {}
+
+
+def get_store(cache_path):
+    if cache_path not in worker_store:
+        worker_store[cache_path] = ResultStore(cache_path)
+    return worker_store[cache_path]
+
+
+def evaluate_spot(spot, method = 'outs', cache_path = None, sampling = None):
+    """
+    Args:
+        sampling (dict): sample_runouts options for method = 'sample' (see main_function)
+
+    Returns:
+        dict: spot's id/hand/flop + results (or 'error')
+    """
+    res = {'id': spot['id'], 'hand': spot.get('hand'), 'flop': spot.get('flop')}
+
+    error = spot_error(spot)
+    if error is None:
+        try:
+            r = parse_range_str(spot['range'])
+        except Exception as e:
+            error = f'Invalid range: {e}'
+
+    if error is not None:
+        res['error'] = error
+        return res
+
+    store = get_store(cache_path) if cache_path else None
+    sample_report = {}
+    hero_hand_type, result_opp, result_hero, opp_improve_probs, opp_draw_probs = main_function(
+        r, spot['flop'], spot['hand'], method = method, store = store, sampling = sampling, report = sample_report)
+
+    if type(result_opp) == int:
+        res['error'] = 'Range is empty after filtering out hand/flop cards'
+        return res
+
+    # equity bounds (same as the GUI's "Villain equity" table)
+    hero_no_improve_probs = result_hero[:, hero_hand_type]
+
+    # turn/river boards only have the last 2/1 streets
+    spot_streets = streets[-len(result_opp):]
+
+    res.update({
+        'hero_hand_type': hand_type_dict[hero_hand_type],
+        'villain': {street: dict(zip(hand_types, row)) for street, row in zip(spot_streets, result_opp.tolist())},
+        'hero': {street: dict(zip(hand_types, row)) for street, row in zip(spot_streets, result_hero.tolist())},
+        'villain_equity_upper': dict(zip(spot_streets, opp_improve_probs.tolist())),
+        'villain_equity_lower': dict(zip(spot_streets, (hero_no_improve_probs * opp_improve_probs).tolist())),
+        'villain_straight_draw': float(opp_draw_probs[0]),
+        'villain_flush_draw': float(opp_draw_probs[1]),
+    })
+
+    # Monte Carlo precision (method = 'sample')
+    if sample_report:
+        res.update({
+            'sample_count': sample_report['total_samples'],
+            'sample_error': sample_report['error'],
+            'sample_converged': sample_report['converged'],
+        })
+
+    return res
+
+
+def evaluate_spots(spots, method = 'outs', cache_path = None, sampling = None):
+    """Worker task: a few spots at once (less pickling per spot)"""
+    return [evaluate_spot(spot, method, cache_path, sampling) for spot in spots]
+
+
+""" --- Output --- """
+
+def flatten(res):
+    """Result dict --> flat dict for CSV (e.g. villain_turn_flush)"""
+    flat = {}
+    for k, v in res.items():
+        if isinstance(v, dict):
+            for k2, v2 in flatten(v).items():
+                flat[f'{k}_{k2}'] = v2
+        else:
+            flat[k] = v
+    return flat
+
+
+class ResultWriter:
+    """Writes results one at a time as JSONL or CSV"""
+
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        self.csv_writer = None
+
+    def write(self, res):
+        if self.fmt == 'csv':
+            flat = flatten(res)
+            if self.csv_writer is None:
+                self.csv_writer = csv.DictWriter(self.f, fieldnames = csv_columns(), extrasaction = 'ignore')
+                self.csv_writer.writeheader()
+            self.csv_writer.writerow(flat)
+        else:
+            self.f.write(json.dumps(res) + '\n')
+
+
+def csv_columns():
+    """Columns of a flattened result (error rows leave the result columns empty)"""
+    columns = ['id', 'hand', 'flop', 'hero_hand_type']
+    columns += [f'{who}_{street}_{hand_type}' for who in ('villain', 'hero') for street in streets for hand_type in hand_types]
+    columns += [f'villain_equity_{bound}_{street}' for bound in ('upper', 'lower') for street in streets]
+    columns += ['villain_straight_draw', 'villain_flush_draw', 'sample_count', 'sample_error', 'sample_converged', 'error']
+
+    return columns
+
+
+""" --- Driver --- """
+
+def batched(iterable, n):
+    batch = []
+    for x in iterable:
+        batch.append(x)
+        if len(batch) == n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_batch(spots, writer, workers = None, method = 'outs', cache_path = None, sampling = None):
+    """
+    Evaluates spots (iterable) and writes results in input order
+
+    Returns:
+        dict: summary (spots, errors, seconds, spots_per_s)
+    """
+    workers = workers or os.cpu_count()
+    num_spots = 0
+    num_errors = 0
+    start = time.perf_counter()
+
+    def emit(results):
+        nonlocal num_spots, num_errors
+        for res in results:
+            writer.write(res)
+            num_spots += 1
+            num_errors += 'error' in res
+        writer.f.flush()
+
+    if workers <= 1:
+        for spots_batch in batched(spots, spots_per_task):
+            emit(evaluate_spots(spots_batch, method, cache_path, sampling))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # bounded window of tasks in flight; oldest is written first (keeps input order)
+        window = deque()
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            for spots_batch in batched(spots, spots_per_task):
+                if len(window) >= workers * tasks_per_worker:
+                    emit(window.popleft().result())
+                window.append(pool.submit(evaluate_spots, spots_batch, method, cache_path, sampling))
+
+            while window:
+                emit(window.popleft().result())
+
+    seconds = time.perf_counter() - start
+
+    return {'spots': num_spots, 'errors': num_errors, 'seconds': seconds,
+            'spots_per_s': num_spots / seconds if seconds > 0 else 0}
+
+
+def guess_format(path, fmt):
+    if fmt:
+        return fmt
+    if path and path.lower().endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Evaluate many hand vs. range spots (main_function)')
+    parser.add_argument('input', nargs = '?', help = 'JSONL/CSV file of spots (default: stdin)')
+    parser.add_argument('-o', '--output', help = 'where to write results (default: stdout)')
+    parser.add_argument('--format', choices = ['jsonl', 'csv'], help = 'input format (default: from extension, else jsonl)')
+    parser.add_argument('--output-format', choices = ['jsonl', 'csv'], help = 'output format (default: from extension, else jsonl)')
+    parser.add_argument('--workers', type = int, default = None, help = 'worker processes (default: # of cores, 1 = serial)')
+    parser.add_argument('--method', choices = ['outs', 'exact', 'sample'], default = 'outs', help = 'see main_function')
+    parser.add_argument('--target-error', type = float, default = None,
+                        help = 'sample: stop once every estimate is within this (95%% CI half-width, see sampling_engine.py)')
+    parser.add_argument('--seed', type = int, default = None, help = 'sample: random seed (same seed --> same results)')
+    parser.add_argument('--cache', help = 'on-disk result cache file (see result_store.py)')
+    parser.add_argument('--profile', metavar = 'PATH',
+                        help = 'time engine stages (runs serially), write flamegraph collapsed stacks to PATH (see profiling.py)')
+    args = parser.parse_args(argv)
+
+    sampling = {'seed': args.seed}
+    if args.target_error is not None:
+        sampling['target_error'] = args.target_error
+
+    in_fmt = guess_format(args.input, args.format)
+    out_fmt = guess_format(args.output, args.output_format)
+
+    fin = open(args.input, newline = '') if args.input else sys.stdin
+    fout = open(args.output, 'w', newline = '') if args.output else sys.stdout
+
+    try:
+        if args.profile:
+            # workers' stages can't be timed from here
+            with profile() as stage_stats:
+                summary = run_batch(read_spots(fin, in_fmt), ResultWriter(fout, out_fmt), 1, args.method, args.cache, sampling)
+
+            stage_stats.dump_collapsed(args.profile)
+            print(stage_stats.report(), file = sys.stderr)
+        else:
+            summary = run_batch(read_spots(fin, in_fmt), ResultWriter(fout, out_fmt), args.workers, args.method, args.cache,
+                                sampling)
+    finally:
+        if args.input:
+            fin.close()
+        if args.output:
+            fout.close()
+
+    print(f"{summary['spots']} spots ({summary['errors']} errors) in {summary['seconds']:.2f}s "
+          f"--> {summary['spots_per_s']:.1f} spots/s", file = sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+'''
+Benchmarks for the probability engine
+
+Times hand_strength, opp_stats, range_vs_hand_prob_matrix and main_function
+over a fixed corpus of flop textures and range sizes, and writes per-call
+latency percentiles, throughput and peak memory (tracemalloc) to JSON.
+
+Results are compared against a baseline JSON, and the run exits with status
+1 when any benchmark's median latency is slower than allowed, or when there
+is no baseline to compare against (unless --save-baseline creates it).
+It also fails if importing poker_engine (in a fresh interpreter) takes longer
+than poker_engine.import_budget_ms, or pulls in pokerkit/tkinter.
+
+    python benchmark.py                      # run, write bench.json, compare to baseline
+    python benchmark.py --save-baseline      # run and store as the new baseline
+    python benchmark.py --quick              # fewer repeats (smoke test)
+
+Range-level benchmarks clear the draw tables (see outs_engine.py) before every
+call, so they measure the engine, not lookups.
+'''
+
+from prob_functions import *
+from outs_engine import clear_draw_tables
+from poker_engine import import_budget_ms
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+flop_corpus = {
+    'monotone': 'Kh8h3h',
+    'paired': 'TsTd4c',
+    'connected': '9c8d7h',
+    'rainbow': 'Ks7d2c',
+}
+hero_hand = 'AdQc'
+range_sizes = [0.05, 0.2, 0.5, 1.0]
+
+default_output = 'bench.json'
+default_baseline = 'benchmark_baseline.json'
+default_tolerance = 0.25
+
+
+""" --- Corpus --- """
+
+def chen_score(hand_class):
+    """
+    Chen formula (preflop strength of hand class, e.g. 'AKs', 'T9o', '77').
+    Only used to order hand classes, so ranges of x% are always the same hands
+    """
+    points = {'A': 10, 'K': 8, 'Q': 7, 'J': 6, 'T': 5}
+    hi, lo = hand_class[0], hand_class[1]
+    hi_num, lo_num = rank_chars.index(hi) + 2, rank_chars.index(lo) + 2
+
+    score = points.get(hi, hi_num / 2)
+
+    if hi == lo:
+        return max(5, score * 2)
+
+    if hand_class.endswith('s'):
+        score += 2
+
+    gap = hi_num - lo_num - 1
+    score -= [0, 1, 2, 4][gap] if gap < 4 else 5
+
+    if gap <= 1 and hi_num < 12:
+        score += 1
+
+    return score
+
+
+def hand_classes():
+    """All 169 hand classes, best first (see chen_score)"""
+    classes = []
+    for i, j in itertools.combinations_with_replacement(range(12, -1, -1), 2):
+        hi, lo = rank_chars[i], rank_chars[j]
+        if i == j:
+            classes.append(hi + lo)
+        else:
+            classes += [hi + lo + 's', hi + lo + 'o']
+
+    return sorted(classes, key = chen_score, reverse = True)
+
+
+def top_range(fraction):
+    """
+    Returns:
+        set(frozenset): best hand classes, until fraction of the 1326 combos is reached
+    """
+    r = set()
+    for hand_class in hand_classes():
+        if len(r) >= fraction * 1326:
+            break
+        r.update(parse_range(hand_class))
+
+    return r
+
+
+""" --- Measuring --- """
+
+def time_calls(func, args_list, setup = None):
+    """
+    Calls func(*args) for each args in args_list
+
+    Returns:
+        list(float): seconds per call
+    """
+    times = []
+    for args in args_list:
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def peak_memory_kb(func, args, setup = None):
+    """Peak memory (tracemalloc) of one call, in KB"""
+    if setup is not None:
+        setup()
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return peak / 1024
+
+
+def summarize(times, combos_per_call = None, peak_kb = None):
+    """
+    Returns:
+        dict: latency percentiles (ms), throughput, peak memory
+    """
+    times_ms = np.array(times) * 1000
+    total = sum(times)
+
+    stats = {
+        'calls': len(times),
+        'mean_ms': float(times_ms.mean()),
+        'p50_ms': float(np.percentile(times_ms, 50)),
+        'p90_ms': float(np.percentile(times_ms, 90)),
+        'p99_ms': float(np.percentile(times_ms, 99)),
+        'calls_per_s': len(times) / total,
+    }
+
+    if combos_per_call is not None:
+        stats['combos_per_s'] = combos_per_call * len(times) / total
+    if peak_kb is not None:
+        stats['peak_mem_kb'] = peak_kb
+
+    return stats
+
+
+def log_stats(name, stats):
+    print(f"{name:45s} p50 {stats['p50_ms']:9.3f}ms  p90 {stats['p90_ms']:9.3f}ms  "
+          f"{stats['calls_per_s']:9.1f} calls/s  peak {stats['peak_mem_kb']:8.1f}KB")
+
+
+def run_benchmarks(repeats = 5, per_call_samples = 500, log = log_stats):
+    """
+    Returns:
+        dict: benchmark name --> stats (see summarize)
+    """
+    results = {}
+    hand = parse_cards(hero_hand)
+    ranges = {size: top_range(size) for size in range_sizes}
+
+    for texture, flop_str in flop_corpus.items():
+        flop = parse_cards(flop_str)
+
+        # every combo that doesn't hit flop/hand (fixed order, so runs are comparable)
+        all_combos = filter_range(range_to_array(ranges[1.0]), flop, hand)
+        step = max(1, len(all_combos) // per_call_samples)
+        sample = [tuple(c) for c in all_combos[::step].tolist()]
+
+        name = f'hand_strength/{texture}'
+        args_list = [(combo, flop) for combo in sample]
+        results[name] = summarize(time_calls(hand_strength, args_list),
+                                  peak_kb = peak_memory_kb(hand_strength, args_list[0]))
+        log(name, results[name])
+
+        name = f'opp_stats/{texture}'
+        args_list = [(flop, hand, combo) for combo in sample]
+        results[name] = summarize(time_calls(opp_stats, args_list),
+                                  peak_kb = peak_memory_kb(opp_stats, args_list[0]))
+        log(name, results[name])
+
+        for size, r in ranges.items():
+            r_array = range_to_array(r)
+            num_combos = len(filter_range(r_array, flop, hand))
+
+            name = f'range_vs_hand_prob_matrix/{texture}/{size:.0%}'
+            args = (r_array, flop, hand, 'opp')
+            times = time_calls(range_vs_hand_prob_matrix, [args] * repeats, setup = clear_draw_tables)
+            results[name] = summarize(times, num_combos, peak_memory_kb(range_vs_hand_prob_matrix, args, clear_draw_tables))
+            log(name, results[name])
+
+            name = f'main_function/{texture}/{size:.0%}'
+            args = (r, flop_str, hero_hand)
+            times = time_calls(main_function, [args] * repeats, setup = clear_draw_tables)
+            results[name] = summarize(times, num_combos, peak_memory_kb(main_function, args, clear_draw_tables))
+            log(name, results[name])
+
+    return results
+
+
+def measure_import(module = 'poker_engine', runs = 5):
+    """
+    Import time of module in fresh interpreters (median of runs)
+
+    Returns:
+        dict: import_ms, heavy modules that got imported along with it
+    """
+    code = ('import sys, time; t = time.perf_counter(); '
+            f'import {module}; '
+            'ms = (time.perf_counter() - t) * 1000; '
+            "print(ms, *[m for m in ('pokerkit', 'tkinter') if m in sys.modules])")
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for i in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], cwd = folder, capture_output = True, text = True, check = True)
+        fields = out.stdout.split()
+        times.append(float(fields[0]))
+
+    return {'import_ms': float(np.median(times)), 'heavy_modules': fields[1:]}
+
+
+""" --- Baseline --- """
+
+def compare_to_baseline(results, baseline, tolerance = default_tolerance):
+    """
+    Args:
+        results, baseline (dict): benchmark name --> stats
+        tolerance (float): allowed slowdown of p50 (0.25 = 25% slower)
+
+    Returns:
+        list(str): one line per regression (empty if none)
+    """
+    regressions = []
+
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = stats['p50_ms'] / baseline[name]['p50_ms']
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: p50 {stats['p50_ms']:.3f}ms vs baseline "
+                               f"{baseline[name]['p50_ms']:.3f}ms ({ratio:.2f}x)")
+
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark the probability engine')
+    parser.add_argument('--output', default = default_output, help = 'where to write results (JSON)')
+    parser.add_argument('--baseline', default = default_baseline, help = 'baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action = 'store_true', help = 'store this run as the baseline')
+    parser.add_argument('--tolerance', type = float, default = default_tolerance,
+                        help = 'allowed p50 slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--repeats', type = int, default = 5, help = 'calls per range-level benchmark')
+    parser.add_argument('--quick', action = 'store_true', help = 'fewer samples/repeats')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        results = run_benchmarks(repeats = 2, per_call_samples = 100)
+    else:
+        results = run_benchmarks(repeats = args.repeats)
+
+    import_stats = measure_import()
+    print(f"import poker_engine: {import_stats['import_ms']:.1f}ms (budget {import_budget_ms}ms)")
+
+    report = {'environment': environment(), 'results': results, 'import': import_stats}
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent = 2)
+    print(f'Results written to {args.output}')
+
+    import_problems = []
+    if import_stats['import_ms'] > import_budget_ms:
+        import_problems.append(f"import poker_engine took {import_stats['import_ms']:.1f}ms "
+                               f"(budget {import_budget_ms}ms)")
+    if import_stats['heavy_modules']:
+        import_problems.append(f"import poker_engine pulled in {', '.join(import_stats['heavy_modules'])}")
+
+    if import_problems:
+        print('\nIMPORT BUDGET EXCEEDED:')
+        for line in import_problems:
+            print('  ' + line)
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent = 2)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'\nNO BASELINE at {args.baseline} (run with --save-baseline to create one)')
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+
+    if regressions:
+        print(f'\nPERFORMANCE REGRESSION ({len(regressions)} benchmarks slower than {args.tolerance:.0%} tolerance):')
+        for line in regressions:
+            print('  ' + line)
+        return 1
+
+    print(f'No regressions vs {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+'''
+Integer card encoding used by the engine
+
+Every card is a small int: card = rank_idx * 4 + suit_idx (0..51)
+- rank_idx: 0 = '2', 1 = '3' ... 12 = 'A'
+- suit_idx: 0 = 'h', 1 = 's', 2 = 'c', 3 = 'd' (same order as static.suits)
+
+Strings ('Ah', 'KdQc') are only used at the GUI/CLI boundary. Inside the
+engine, use the lookup lists below instead of slicing strings:
+- card_rank[c]: rank as int 2..14 (same numbers as card_toNum)
+- card_suit[c]: suit as int 0..3
+- card_str[c]: e.g. 'Ah'
+'''
+
+rank_chars = '23456789TJQKA'
+suit_chars = 'hscd'
+
+card_rank = [i // 4 + 2 for i in range(52)]
+card_suit = [i % 4 for i in range(52)]
+card_str = [rank_chars[i // 4] + suit_chars[i % 4] for i in range(52)]
+
+str_to_card = {s: i for i, s in enumerate(card_str)}
+suit_toNum = {s: i for i, s in enumerate(suit_chars)}
+
+full_deck = frozenset(range(52))
+
+
+def make_card(num, suit):
+    """
+    Args:
+        num (int): rank as int (2..14). 1 is accepted as a low ace
+        suit (int): 0..3
+
+    Returns:
+        int: card id. E.g. make_card(14, 0) --> 51 ('Ah')
+    """
+    if num == 1:
+        num = 14
+    return (num - 2) * 4 + suit
+
+
+def parse_cards(s):
+    """
+    Args:
+        s (str): cards in string form. E.g. 'Kd3c'
+
+    Returns:
+        tuple(int): E.g. (47, 4)
+    """
+    return tuple(str_to_card[s[i:i+2]] for i in range(0, len(s), 2))
+
+
+def cards_to_str(cards):
+    """
+    Inverse of parse_cards. E.g. (47, 4) --> 'Kd3c'
+    """
+    return ''.join(card_str[c] for c in cards)
+
+
+def pokerkit_card_to_int(card):
+    """
+    Turns pokerkit Card into int without going through str(card)
+    """
+    return str_to_card[card.rank.value + card.suit.value]
+
+
+def combo_to_cards(two_cards):
+    """
+    Turns frozenset of 2 pokerkit Cards (range element) into a pair of ints
+
+    Returns:
+        tuple(int, int): sorted in ascending order
+    """
+    card1, card2 = two_cards
+    c1 = pokerkit_card_to_int(card1)
+    c2 = pokerkit_card_to_int(card2)
+
+    if c1 > c2:
+        return c2, c1
+    return c1, c2
@@ -0,0 +1,182 @@
+'''
+Ranges as 1326-slot masks
+
+Every 2-card combo has a fixed id 0..1325 (combos of card ints in ascending
+order, see cards.py): combo_cards[id] = (c1, c2) with c1 < c2, and
+combo_index[c1, c2] = combo_index[c2, c1] = id.
+
+A Range is a bool mask over those ids, so membership, union, difference,
+blocker removal and counting are numpy ops on one 1326-entry array, instead
+of set operations on frozensets of pokerkit Cards. Range.from_set/to_set
+convert to and from the set form used by pokerkit's parse_range.
+'''
+
+from cards import *
+import itertools
+import numpy as np
+
+num_combos = 1326
+
+combo_cards = np.array(list(itertools.combinations(range(52), 2)), dtype = np.int64)
+
+combo_index = np.full((52, 52), -1, dtype = np.int64)
+combo_index[combo_cards[:, 0], combo_cards[:, 1]] = np.arange(num_combos)
+combo_index[combo_cards[:, 1], combo_cards[:, 0]] = np.arange(num_combos)
+
+# card_combos[c]: mask of the 51 combos that contain card c
+card_combos = np.zeros((52, num_combos), dtype = bool)
+card_combos[combo_cards[:, 0], np.arange(num_combos)] = True
+card_combos[combo_cards[:, 1], np.arange(num_combos)] = True
+
+pokerkit_deck = []
+
+
+def pokerkit_cards():
+    """card int --> pokerkit Card (built on first use)"""
+    if not pokerkit_deck:
+        from pokerkit import Card
+        pokerkit_deck.extend(Card.parse(''.join(card_str)))
+
+    return pokerkit_deck
+
+
+def blocker_mask(*cards):
+    """
+    Returns:
+        (1326,) bool array: True for combos that contain any of cards
+    """
+    if not cards:
+        return np.zeros(num_combos, dtype = bool)
+
+    return card_combos[list(cards)].any(axis = 0)
+
+
+def hand_class_mask(hand_class):
+    """
+    Combos of a grid cell without going through pokerkit
+
+    Args:
+        hand_class (str): e.g. 'AKs' (suited), 'AKo' (offsuit), 'AK' (both), 'QQ' (pair)
+
+    Returns:
+        (1326,) bool array
+    """
+    r1, r2 = rank_chars.index(hand_class[0]), rank_chars.index(hand_class[1])
+    ranks = combo_cards // 4
+    suited = combo_cards[:, 0] % 4 == combo_cards[:, 1] % 4
+
+    mask = ((ranks[:, 0] == r1) & (ranks[:, 1] == r2)) | ((ranks[:, 0] == r2) & (ranks[:, 1] == r1))
+
+    if hand_class.endswith('s'):
+        mask &= suited
+    elif hand_class.endswith('o'):
+        mask &= ~suited
+
+    return mask
+
+
+class Range:
+    """
+    Set of 2-card combos as a (1326,) bool mask (see combo ids above)
+
+    E.g.
+        r = Range.from_str('QQ+,AKs')
+        r = r.remove_cards(*parse_cards('AhKd7c'))
+        len(r), r.combos()
+    """
+
+    def __init__(self, mask = None):
+        if mask is None:
+            mask = np.zeros(num_combos, dtype = bool)
+
+        self.mask = np.asarray(mask, dtype = bool)
+
+    """ --- Conversions --- """
+
+    @classmethod
+    def from_ids(cls, ids):
+        mask = np.zeros(num_combos, dtype = bool)
+        mask[np.asarray(ids, dtype = np.int64)] = True
+        return cls(mask)
+
+    @classmethod
+    def from_cards(cls, combos):
+        """combos: (N, 2) int array of cards (any order within a combo)"""
+        combos = np.asarray(combos, dtype = np.int64).reshape(-1, 2)
+        return cls.from_ids(combo_index[combos[:, 0], combos[:, 1]])
+
+    @classmethod
+    def from_set(cls, r):
+        """r: set of frozenset of 2 pokerkit Cards (e.g. from parse_range)"""
+        return cls.from_cards([combo_to_cards(hand) for hand in r])
+
+    @classmethod
+    def from_str(cls, s):
+        """Range notation of pokerkit's parse_range, e.g. 'QQ+,AKs,T9o'"""
+        from pokerkit import parse_range
+        return cls.from_set(parse_range(s))
+
+    @classmethod
+    def full(cls):
+        return cls(np.ones(num_combos, dtype = bool))
+
+    def ids(self):
+        """(N,) int array of combo ids in range (ascending)"""
+        return np.flatnonzero(self.mask)
+
+    def combos(self):
+        """(N, 2) int array of cards (what the engine takes, see range_to_array)"""
+        return combo_cards[self.mask]
+
+    def to_set(self):
+        """set of frozenset of 2 pokerkit Cards"""
+        deck = pokerkit_cards()
+        return {frozenset((deck[c1], deck[c2])) for c1, c2 in self.combos().tolist()}
+
+    def copy(self):
+        return Range(self.mask.copy())
+
+    """ --- Set operations --- """
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    def __contains__(self, combo):
+        """combo: frozenset of 2 pokerkit Cards, or 2 card ints"""
+        if isinstance(combo, frozenset):
+            c1, c2 = combo_to_cards(combo)
+        else:
+            c1, c2 = combo
+
+        return bool(self.mask[combo_index[c1, c2]])
+
+    def __eq__(self, other):
+        return isinstance(other, Range) and np.array_equal(self.mask, other.mask)
+
+    def __or__(self, other):
+        return Range(self.mask | other.mask)
+
+    def __and__(self, other):
+        return Range(self.mask & other.mask)
+
+    def __sub__(self, other):
+        return Range(self.mask & ~other.mask)
+
+    def __ior__(self, other):
+        self.mask |= other.mask
+        return self
+
+    def __iand__(self, other):
+        self.mask &= other.mask
+        return self
+
+    def __isub__(self, other):
+        self.mask &= ~other.mask
+        return self
+
+    def remove_cards(self, *cards):
+        """Range without the combos that contain any of cards (e.g. board/hero's hand)"""
+        return Range(self.mask & ~blocker_mask(*cards))
+
+    def __repr__(self):
+        return f'Range({len(self)} combos)'
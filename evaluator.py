@@ -0,0 +1,351 @@
+'''
+Fast hand evaluator (numpy)
+
+Scores 5, 6 or 7 card hands as one comparable int (higher = better):
+
+    score = hand_type << 20 | up to 5 ranks, 4 bits each (most important first)
+
+hand_type uses the same numbers as hand_type_dict, so score >> 20 is the hand type.
+Ranks inside the score are rank indices (0 = '2' ... 12 = 'A', see cards.py).
+
+Scoring is two table lookups (see hand_rank_table below):
+- rank counts --> perfect hash --> score of best non-flush hand
+- rank mask of flush suit (if 5+ cards) --> score of best flush/straight flush
+The tables are generated once by compute_scores, saved as a .npy file next to
+this module and memory-mapped on import, so all processes share the same pages.
+'''
+
+import os
+import numpy as np
+
+rank_bits = 1 << np.arange(13, dtype = np.int64)
+
+# 13-bit rank mask tables (bit r of mask m --> mask_bits[m, r])
+all_masks = np.arange(8192, dtype = np.int64)
+mask_bits = (all_masks[:, None] >> np.arange(13)) & 1
+
+popcount = mask_bits.sum(axis = 1)
+highest_bit = np.where(all_masks > 0, 12 - np.argmax(mask_bits[:, ::-1], axis = 1), -1)
+
+
+def build_straight_high():
+    """
+    straight_high[mask]: rank idx of top card of best straight in mask (-1 if none)
+    Wheel (A2345) counts as 5-high (idx 3)
+    """
+    table = np.full(8192, -1, dtype = np.int64)
+    wheel = (1 << 12) | 0b1111
+    table[all_masks & wheel == wheel] = 3
+
+    # higher straights overwrite lower ones
+    for high in range(4, 13):
+        window = 0b11111 << (high - 4)
+        table[all_masks & window == window] = high
+
+    return table
+
+
+def build_top_ranks(k):
+    """
+    top_ranks[mask]: highest k ranks in mask packed 4 bits each (highest first)
+    E.g. k = 3, mask with ranks {12, 7, 5, 0} --> 12 << 8 | 7 << 4 | 5
+    """
+    packed = np.zeros(8192, dtype = np.int64)
+    found = np.zeros(8192, dtype = np.int64)
+
+    for r in range(12, -1, -1):
+        take = (mask_bits[:, r] == 1) & (found < k)
+        packed = np.where(take, (packed << 4) | r, packed)
+        found += take
+
+    # keep alignment if mask has less than k ranks
+    return packed << (4 * (k - found))
+
+
+straight_high = build_straight_high()
+top_ranks = {k: build_top_ranks(k) for k in (2, 3, 5)}
+
+
+def rank_bit(r):
+    """1 << r for rank idx array r (0 where r = -1)"""
+    return np.where(r >= 0, 1 << np.maximum(r, 0), 0)
+
+
+def hand_counts(cards):
+    """
+    Args:
+        cards: (M, k) int array of cards
+
+    Returns:
+        rank_counts: (M, 13) int array
+        suit_masks: (M, 4) int array of 13-bit rank masks per suit
+    """
+    m = len(cards)
+    rows = np.repeat(np.arange(m), cards.shape[1])
+    flat = cards.ravel()
+
+    rank_counts = np.bincount(rows * 13 + flat // 4, minlength = m * 13).reshape(m, 13)
+
+    # cards are unique, so summing bits == OR-ing them
+    suit_masks = np.bincount(rows * 4 + flat % 4, weights = rank_bits[flat // 4],
+                             minlength = m * 4).reshape(m, 4).astype(np.int64)
+
+    return rank_counts, suit_masks
+
+
+def compute_scores(rank_counts, suit_masks):
+    """
+    Scores hands from their rank counts and per-suit rank masks by working
+    out the hand type directly. Used to generate hand_rank_table 
+    (score_from_counts is the fast version)
+
+    Args:
+        rank_counts: (..., 13) int array
+        suit_masks: (..., 4) int array
+
+    Returns:
+        (...) int64 array of scores
+    """
+    shape = rank_counts.shape[:-1]
+    rank_counts = rank_counts.reshape(-1, 13)
+    suit_masks = suit_masks.reshape(-1, 4)
+
+    present = (rank_counts > 0) @ rank_bits
+    mask2 = (rank_counts >= 2) @ rank_bits
+    mask3 = (rank_counts >= 3) @ rank_bits
+    mask4 = (rank_counts >= 4) @ rank_bits
+
+    # flush (max 1 flush suit with 7 cards)
+    suit_pop = popcount[suit_masks]
+    flush_suit = suit_pop.argmax(axis = 1)
+    flush_mask = suit_masks[np.arange(len(suit_masks)), flush_suit]
+    is_flush = suit_pop.max(axis = 1) >= 5
+
+    sf_high = straight_high[np.where(is_flush, flush_mask, 0)]
+    is_straight_flush = sf_high >= 0
+
+    quad = highest_bit[mask4]
+    trip = highest_bit[mask3]
+    fh_pair_mask = mask2 & ~rank_bit(trip)
+    is_full_house = (trip >= 0) & (fh_pair_mask > 0)
+
+    s_high = straight_high[present]
+
+    pair1 = highest_bit[mask2]
+    pair2 = highest_bit[mask2 & ~rank_bit(pair1)]
+
+    scores = np.select(
+        [is_straight_flush,
+         quad >= 0,
+         is_full_house,
+         is_flush,
+         s_high >= 0,
+         trip >= 0,
+         pair2 >= 0,
+         pair1 >= 0],
+        [(8 << 20) | (sf_high << 16),
+         (7 << 20) | (quad << 16) | (highest_bit[present & ~rank_bit(quad)] << 12),
+         (6 << 20) | (trip << 16) | (highest_bit[fh_pair_mask] << 12),
+         (5 << 20) | top_ranks[5][flush_mask],
+         (4 << 20) | (s_high << 16),
+         (3 << 20) | (trip << 16) | (top_ranks[2][present & ~rank_bit(trip)] << 8),
+         (2 << 20) | (pair1 << 16) | (pair2 << 12) | (highest_bit[present & ~rank_bit(pair1) & ~rank_bit(pair2)] << 8),
+         (1 << 20) | (pair1 << 16) | (top_ranks[3][present & ~rank_bit(pair1)] << 4)],
+        default = top_ranks[5][present])
+
+    return scores.reshape(shape)
+
+
+""" --- Lookup tables --- """
+
+max_cards = 7
+table_version = 1
+table_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f'hand_rank_table_v{table_version}.npy')
+
+
+def build_hash_tables():
+    """
+    Perfect hash for rank counts (each 0..4, total 0..7 cards)
+
+    ways[i][k]: # of ways to spread k cards over ranks i..12
+    contrib[i, rem, cnt]: # of count vectors that come before this one
+    at rank i (given rem cards still to place)
+
+    Returns:
+        contrib: (13, 8, 5) int array
+        offsets: (8,) int array, where hands of n cards start in the table
+        table_size (int)
+    """
+    ways = [[0] * (max_cards + 1) for i in range(14)]
+    ways[13][0] = 1
+
+    for i in range(12, -1, -1):
+        for k in range(max_cards + 1):
+            ways[i][k] = sum(ways[i + 1][k - c] for c in range(min(4, k) + 1))
+
+    contrib = np.zeros((13, max_cards + 1, 5), dtype = np.int64)
+    for i in range(13):
+        for rem in range(max_cards + 1):
+            for cnt in range(1, 5):
+                contrib[i, rem, cnt] = contrib[i, rem, cnt - 1] + (ways[i + 1][rem - cnt + 1] if rem >= cnt - 1 else 0)
+
+    offsets = np.cumsum([0] + [ways[0][k] for k in range(max_cards)])
+    table_size = int(offsets[-1] + ways[0][max_cards])
+
+    return contrib.reshape(-1), offsets, table_size
+
+
+hash_contrib, hash_offsets, noflush_size = build_hash_tables()
+
+
+def rank_count_index(rank_counts):
+    """
+    Args:
+        rank_counts: (M, 13) int array
+
+    Returns:
+        (M,) int array: index into non-flush part of hand_rank_table
+    """
+    n = rank_counts.sum(axis = 1)
+    rem = n[:, None] - np.cumsum(rank_counts, axis = 1) + rank_counts
+    idx = np.arange(13) * 40 + rem * 5 + rank_counts
+
+    return hash_offsets[n] + hash_contrib[idx].sum(axis = 1)
+
+
+def all_rank_counts():
+    """Every rank count vector (each 0..4) with 0..7 cards in total"""
+    res = []
+
+    def fill(i, counts, left):
+        if i == 13:
+            res.append(counts.copy())
+            return
+        for c in range(min(4, left) + 1):
+            counts[i] = c
+            fill(i + 1, counts, left - c)
+        counts[i] = 0
+
+    fill(0, [0] * 13, max_cards)
+    return np.array(res, dtype = np.int64)
+
+
+def generate_table():
+    """
+    Returns:
+        int32 array: [8192 flush scores by rank mask | non-flush scores by rank_count_index]
+    """
+    # flush/straight flush: all cards in suit 0 (0 if < 5 cards)
+    masks = np.arange(8192, dtype = np.int64)
+    mask_counts = ((masks[:, None] & rank_bits) > 0).astype(np.int64)
+    mask_suits = np.zeros((8192, 4), dtype = np.int64)
+    mask_suits[:, 0] = masks
+    flush_scores = np.where(popcount >= 5, compute_scores(mask_counts, mask_suits), 0)
+
+    # non-flush: suit masks left empty so flush never triggers
+    counts = all_rank_counts()
+    noflush_scores = np.zeros(noflush_size, dtype = np.int64)
+    noflush_scores[rank_count_index(counts)] = compute_scores(counts, np.zeros((len(counts), 4), dtype = np.int64))
+
+    return np.concatenate([flush_scores, noflush_scores]).astype(np.int32)
+
+
+def load_table(path = table_path):
+    """
+    Memory-maps the table (generates + saves it first if the file is missing).
+    Written to a temp file and renamed, so processes starting at the same time
+    never read a half-written file
+    """
+    if not os.path.exists(path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, generate_table())
+        os.replace(tmp_path, path)
+
+    return np.load(path, mmap_mode = 'r')
+
+
+hand_rank_table = load_table()
+flush_table = hand_rank_table[:8192]
+noflush_table = hand_rank_table[8192:]
+
+
+def noflush_scores(rank_counts):
+    """
+    Args:
+        rank_counts: (..., 13) int array
+
+    Returns:
+        (...) int64 array: score of best hand ignoring suits
+    """
+    shape = rank_counts.shape[:-1]
+    idx = rank_count_index(rank_counts.reshape(-1, 13))
+
+    return noflush_table[idx].astype(np.int64).reshape(shape)
+
+
+def flush_scores(suit_masks):
+    """
+    Args:
+        suit_masks: (..., 4) int array
+
+    Returns:
+        (...) int64 array: score of best flush/straight flush (0 if no flush)
+    """
+    return flush_table[suit_masks].max(axis = -1).astype(np.int64)
+
+
+def score_from_counts(rank_counts, suit_masks):
+    """
+    Scores hands from their rank counts and per-suit rank masks.
+    Lets callers build counts once for a shared board and just add hole cards
+
+    Args:
+        rank_counts: (..., 13) int array
+        suit_masks: (..., 4) int array
+
+    Returns:
+        (...) int64 array of scores
+    """
+    # with 7 cards or less, a flush always beats the best non-flush hand
+    return np.maximum(flush_scores(suit_masks), noflush_scores(rank_counts))
+
+
+def score_hands(cards):
+    """
+    Args:
+        cards: (M, k) int array, k = 5, 6 or 7
+
+    Returns:
+        (M,) int64 array of scores (best 5 of k)
+    """
+    cards = np.asarray(cards, dtype = np.int64)
+    return score_from_counts(*hand_counts(cards))
+
+
+def score_hand(cards):
+    """
+    Scalar version of score_hands (no numpy overhead). 
+    E.g. score_hand(parse_cards('AhKhQhJhTh'))
+    """
+    rank_counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    for c in cards:
+        rank_counts[c >> 2] += 1
+        suit_masks[c & 3] |= 1 << (c >> 2)
+
+    idx = hash_offsets[len(cards)]
+    rem = len(cards)
+    for i, cnt in enumerate(rank_counts):
+        idx += hash_contrib[i * 40 + rem * 5 + cnt]
+        rem -= cnt
+
+    score = noflush_table[idx]
+    for m in suit_masks:
+        score = max(score, flush_table[m])
+
+    return int(score)
+
+
+def hand_type_of(scores):
+    return scores >> 20
@@ -0,0 +1,384 @@
+'''
+Offline flop database: villain's flop category + draws for every combo
+
+For each of the 1755 suit-isomorphic flops x 1326 combos, stores (packed in
+one uint32):
+
+    bits 0-23   evaluator score of flop + combo (score >> 20 = hand type, see evaluator.py)
+    bit 24      straight draw (same as opp_stats' is_draw_stats, ignoring hero's blockers)
+    bit 25      flush draw
+
+Combos that share a card with the flop are stored as blocked_value. Rows that
+haven't been generated yet are all unset_value.
+
+Files (memory-mapped, so lookups only touch the pages they need):
+
+    flop_db_v1.npy         (1755, 1326) uint32, one row per canonical flop
+    flop_db_v1_index.npy   (22100, 2) int16: for every flop (by flop_id), its row
+                           and the suit permutation (perms) that maps it onto that row
+
+Lookups relabel the range's combo ids with the flop's suit permutation and
+gather the whole range (or many flops x the whole range) at once:
+
+    db = FlopDatabase()
+    counts, draw_counts, n = db.range_histogram(parse_cards('QdTd5c'), Range.from_str('QQ+,AKs'))
+
+Generation is parallel (chunks of flops on a process pool, the parent is the
+only writer) and resumable: rows are flushed after every chunk, and a rerun
+only does rows that still have unset values.
+
+    python flop_db.py generate --workers 8
+    python flop_db.py histogram QdTd5c "QQ+,AKs,T9s"
+'''
+
+from cards import *
+from combo_range import Range, num_combos, combo_cards, combo_index, blocker_mask
+from evaluator import hand_counts, score_from_counts, popcount
+from spot_cache import suit_relabeling, relabel_cards
+from math import comb
+import argparse
+import itertools
+import os
+import sys
+import time
+import numpy as np
+
+db_version = 1
+module_dir = os.path.dirname(os.path.abspath(__file__))
+default_path = os.path.join(module_dir, f'flop_db_v{db_version}.npy')
+
+num_flops = comb(52, 3)
+num_categories = 9
+
+unset_value = np.uint32(0xFFFFFFFF)
+blocked_value = np.uint32(0xFFFFFFFE)
+score_bits = (1 << 24) - 1
+straight_draw_bit = 1 << 24
+flush_draw_bit = 1 << 25
+
+flops_per_task = 32
+
+# every suit permutation, and combo id --> combo id after relabeling suits with it
+perms = list(itertools.permutations(range(4)))
+perm_ids = {perm: i for i, perm in enumerate(perms)}
+
+perm_combo = np.zeros((len(perms), num_combos), dtype = np.int64)
+for i, perm in enumerate(perms):
+    new_cards = (combo_cards & ~3) | np.array(perm)[combo_cards & 3]
+    perm_combo[i] = combo_index[new_cards[:, 0], new_cards[:, 1]]
+
+
+""" --- Flops --- """
+
+def flop_id(flop):
+    """Index of a flop among all 22100 (any card order). E.g. flop_id((0, 1, 2)) --> 0"""
+    c1, c2, c3 = sorted(flop)
+    return comb(c1, 1) + comb(c2, 2) + comb(c3, 3)
+
+
+def all_flops():
+    """(22100, 3) int array, row i = flop with flop_id i"""
+    flops = np.array(list(itertools.combinations(range(52), 3)), dtype = np.int64)
+    ids = [flop_id(flop) for flop in flops.tolist()]
+
+    res = np.zeros_like(flops)
+    res[ids] = flops
+    return res
+
+
+def build_index():
+    """
+    Returns:
+        canonical_flops: (1755, 3) int array, one per db row
+        index: (22100, 2) int16 array, [flop_id] = (row, perm id)
+    """
+    flops = all_flops()
+    index = np.zeros((num_flops, 2), dtype = np.int16)
+    rows = {}
+
+    for i, flop in enumerate(flops.tolist()):
+        new_suit = suit_relabeling(flop)
+        canonical = relabel_cards(flop, new_suit)
+
+        if canonical not in rows:
+            rows[canonical] = len(rows)
+        index[i] = rows[canonical], perm_ids[tuple(new_suit)]
+
+    canonical_flops = np.array(sorted(rows, key = rows.get), dtype = np.int64)
+    return canonical_flops, index
+
+
+def index_path(path):
+    return path[:-len('.npy')] + '_index.npy'
+
+
+def save_atomic(path, array):
+    """Temp file + rename, so readers never see a half-written file"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+""" --- Generation --- """
+
+def straight_draws(rank_masks):
+    """
+    Args:
+        rank_masks: (N,) int array of 13-bit rank masks
+
+    Returns:
+        (N,) bool array: some single rank completes a straight (4 of some 5 in a row)
+    """
+    # bit 0 = low ace, bit r + 1 = rank r
+    masks = (rank_masks << 1) | (rank_masks >> 12)
+
+    res = np.zeros(len(rank_masks), dtype = bool)
+    for low in range(10):
+        res |= popcount[(masks >> low) & 31] == 4
+
+    return res
+
+
+def flop_values(flop):
+    """
+    Packed values of every combo on one flop
+
+    Returns:
+        (1326,) uint32 array
+    """
+    playable = ~blocker_mask(*flop)
+    combos = combo_cards[playable]
+
+    boards = np.hstack([combos, np.broadcast_to(np.array(flop, dtype = np.int64), (len(combos), 3))])
+    rank_counts, suit_masks = hand_counts(boards)
+
+    scores = score_from_counts(rank_counts, suit_masks)
+    hand_types = scores >> 20
+
+    rank_masks = ((rank_counts > 0) << np.arange(13)).sum(axis = 1)
+    is_straight_draw = (hand_types >= 4) | straight_draws(rank_masks)
+    is_flush_draw = (hand_types >= 5) | (popcount[suit_masks].max(axis = 1) == 4)
+
+    values = np.full(num_combos, blocked_value, dtype = np.uint32)
+    values[playable] = scores | (is_straight_draw * straight_draw_bit) | (is_flush_draw * flush_draw_bit)
+
+    return values
+
+
+def flop_chunk_values(flops):
+    """Worker task: (F, 3) flops --> (F, 1326) uint32"""
+    return np.stack([flop_values(tuple(flop)) for flop in np.asarray(flops).tolist()])
+
+
+def generate(path = default_path, workers = None, progress = None):
+    """
+    Builds (or finishes) the database at path
+
+    Args:
+        workers (int): processes (default: # of cores, 1 = serial)
+        progress (callable): progress(done, total) (rows) after each chunk
+
+    Returns:
+        int: # of rows generated by this call
+    """
+    canonical_flops, index = build_index()
+
+    if not os.path.exists(index_path(path)):
+        save_atomic(index_path(path), index)
+
+    if not os.path.exists(path):
+        # open_memmap zero-fills: only move the file into place once every row is unset_value,
+        # so a run killed in between can't leave zero rows that look generated
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        db = np.lib.format.open_memmap(tmp_path, mode = 'w+', dtype = np.uint32, shape = (len(canonical_flops), num_combos))
+        db[:] = unset_value
+        db.flush()
+        del db
+        os.replace(tmp_path, path)
+
+    db = np.load(path, mmap_mode = 'r+')
+    if db.shape != (len(canonical_flops), num_combos) or db.dtype != np.uint32:
+        raise ValueError(f'{path}: unexpected shape/dtype {db.shape} {db.dtype}, delete it to regenerate')
+
+    # rows with any unset value (never done, or cut off mid-write)
+    todo = np.flatnonzero((db == unset_value).any(axis = 1))
+    chunks = [todo[i: i + flops_per_task] for i in range(0, len(todo), flops_per_task)]
+
+    workers = workers or os.cpu_count()
+    done = 0
+
+    def write(rows, values):
+        nonlocal done
+        db[rows] = values
+        db.flush()
+
+        done += len(rows)
+        if progress is not None:
+            progress(done, len(todo))
+
+    if workers <= 1:
+        for rows in chunks:
+            write(rows, flop_chunk_values(canonical_flops[rows]))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            futures = [(rows, pool.submit(flop_chunk_values, canonical_flops[rows])) for rows in chunks]
+            try:
+                for rows, future in futures:
+                    write(rows, future.result())
+            except BaseException:
+                for rows, future in futures:
+                    future.cancel()
+                raise
+
+    del db
+    return done
+
+
+""" --- Lookups --- """
+
+class FlopDatabase:
+    """
+    Read-only, memory-mapped view of a generated database (see generate)
+    """
+
+    def __init__(self, path = default_path):
+        if not os.path.exists(path) or not os.path.exists(index_path(path)):
+            raise FileNotFoundError(f'{path}: no flop database, run python flop_db.py generate')
+
+        self.db = np.load(path, mmap_mode = 'r')
+        self.index = np.load(index_path(path))
+
+    def flop_rows(self, flops):
+        """
+        Args:
+            flops: list of flops (tuple(int))
+
+        Returns:
+            rows, perm ids: (F,) int arrays
+        """
+        ids = [flop_id(flop) for flop in flops]
+        entries = self.index[ids].astype(np.int64)
+
+        return entries[:, 0], entries[:, 1]
+
+    def values(self, flop, ids):
+        """
+        Args:
+            flop (tuple(int))
+            ids: (N,) int array of combo ids (see combo_range.py)
+
+        Returns:
+            (N,) uint32 packed values (blocked_value for combos that share a card with flop)
+        """
+        rows, perm = self.flop_rows([flop])
+        values = self.db[rows[0], perm_combo[perm[0]][ids]]
+
+        if (values == unset_value).any():
+            raise ValueError(f'Flop {cards_to_str(flop)} is not generated yet, run python flop_db.py generate')
+
+        return values
+
+    def lookup(self, flop, combos):
+        """
+        Args:
+            flop (tuple(int)): e.g. parse_cards('QdTd5c')
+            combos: (N, 2) int array (none on the flop)
+
+        Returns:
+            hand_types: (N,) int array
+            scores: (N,) int array (evaluator scores)
+            is_draw_stats: (N, 2) int array, [straight draw, flush draw]
+        """
+        values = self.values(flop, combo_index[combos[:, 0], combos[:, 1]]).astype(np.int64)
+
+        scores = values & score_bits
+        is_draw_stats = np.stack([(values & straight_draw_bit) > 0, (values & flush_draw_bit) > 0], axis = 1)
+
+        return scores >> 20, scores, is_draw_stats.astype(np.int64)
+
+    def range_histograms(self, flops, r, dead_cards = ()):
+        """
+        Category histogram of range r on each of many flops (one gather for all of them)
+
+        Args:
+            flops: list of flops (tuple(int))
+            r (Range)
+            dead_cards: cards to remove from the range too (e.g. hero's hand)
+
+        Returns:
+            counts: (F, 9) int array, # of combos per hand type
+            draw_counts: (F, 2) int array, # of combos with [straight draw, flush draw]
+            n: (F,) int array, # of combos left after removing flop/dead cards
+        """
+        ids = np.flatnonzero(r.mask & ~blocker_mask(*dead_cards))
+        rows, perm = self.flop_rows(flops)
+
+        values = self.db[rows[:, None], perm_combo[perm][:, ids]].astype(np.int64)
+        if (values == unset_value).any():
+            raise ValueError('Some flops are not generated yet, run python flop_db.py generate')
+
+        valid = values != blocked_value
+
+        hand_types = np.where(valid, (values & score_bits) >> 20, 0)
+        flop_pos = np.arange(len(flops))[:, None] * num_categories
+
+        counts = np.bincount((flop_pos + hand_types)[valid], minlength = len(flops) * num_categories)
+        draw_counts = np.stack([((values & straight_draw_bit) > 0) & valid, ((values & flush_draw_bit) > 0) & valid], axis = 2)
+
+        return counts.reshape(len(flops), num_categories), draw_counts.sum(axis = 1), valid.sum(axis = 1)
+
+    def range_histogram(self, flop, r, dead_cards = ()):
+        """
+        range_histograms for one flop. counts / n is villain's flop row (result_opp[0]),
+        draw_counts / n is avg is_draw_stats (ignoring hero's blockers unless in dead_cards)
+        """
+        counts, draw_counts, n = self.range_histograms([flop], r, dead_cards)
+        return counts[0], draw_counts[0], int(n[0])
+
+
+""" --- Command line --- """
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Offline flop database (flop category + draws of every combo)')
+    parser.add_argument('--path', default = default_path, help = 'database file')
+    sub = parser.add_subparsers(dest = 'command', required = True)
+
+    gen = sub.add_parser('generate', help = 'build the database (resumes if interrupted)')
+    gen.add_argument('--workers', type = int, default = None, help = 'worker processes (default: # of cores, 1 = serial)')
+
+    hist = sub.add_parser('histogram', help = 'category histogram of a range on a flop')
+    hist.add_argument('flop', help = "e.g. 'QdTd5c'")
+    hist.add_argument('range', help = "pokerkit range notation, e.g. 'QQ+,AKs'")
+    hist.add_argument('--dead', default = '', help = "cards to remove from the range, e.g. hero's hand 'AdQc'")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        start = time.perf_counter()
+
+        def progress(done, total):
+            print(f'\r{done}/{total} flops', end = '', file = sys.stderr)
+
+        rows = generate(args.path, args.workers, progress)
+        print(f'\n{rows} flops generated in {time.perf_counter() - start:.1f}s --> {args.path}', file = sys.stderr)
+
+    elif args.command == 'histogram':
+        from hand_strength import hand_type_dict
+
+        db = FlopDatabase(args.path)
+        counts, draw_counts, n = db.range_histogram(parse_cards(args.flop), Range.from_str(args.range), parse_cards(args.dead))
+
+        for hand_type, count in enumerate(counts.tolist()):
+            print(f'{hand_type_dict[hand_type]:<16}{count:>6}{count / max(n, 1) * 100:>8.1f}%')
+        print(f"{'straight draw':<16}{draw_counts[0]:>6}{draw_counts[0] / max(n, 1) * 100:>8.1f}%")
+        print(f"{'flush draw':<16}{draw_counts[1]:>6}{draw_counts[1] / max(n, 1) * 100:>8.1f}%")
+        print(f"{'combos':<16}{n:>6}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,6 @@
-from pokerkit import *
 from static import card_dict, card_toNum, ranks, suits
+from cards import card_rank, card_suit, parse_cards, cards_to_str
+from evaluator import score_hand
 from collections import Counter
 from collections import defaultdict
     
@@ -41,96 +42,89 @@ def board_freq(elements):
     frequency_dict = dict(frequency_dict)
     return frequency_dict
 
-def board_counts(s):
+def board_counts(cards):
     """
     Preps info needed to get hand type (pair, flush, straight etc.)
 
     Args:
-        s (str): board. E.g.'Kd3cKc7cTs'
+        cards (tuple(int)): board. E.g. parse_cards('Kd3cKc7cTs')
 
     Returns:
         1. nums sorted by freq, magnitude
-        2. List[char] of suits
+        2. List[int] of suits
         3. Dict of num freqs. E.g. {2: [13], 1: [3, 7, 10]}
-        4. Dict of suits freq E.g. {1: ['d', 's'], 3: ['c']}
+        4. Dict of suits freq E.g. {1: [3, 1], 3: [2]}
     """
 
-    nums = [card_toNum[s[i]] for i in range(0, len(s), 2)]
-    suits = [s[i + 1] for i in range(0, len(s), 2)]
+    nums = [card_rank[c] for c in cards]
+    suits = [card_suit[c] for c in cards]
 
     return custom_sort(nums), suits, board_freq(nums), board_freq(suits)
 
 
-def rank_counts(s):
+def rank_counts(cards):
     """
     Args:
-        s (str): board. E.g.'Kd3cKc7cTs'
+        cards (tuple(int)): board. E.g. parse_cards('Kd3cKc7cTs')
 
     Returns: 
         Dict of num freqs. E.g. {2: [13], 1: [3, 7, 10]}
     """
     
 
-    nums = [card_toNum[s[i]] for i in range(0, len(s), 2)]
+    nums = [card_rank[c] for c in cards]
     return board_freq(nums)
 
-def suit_counts(s):
+def suit_counts(cards):
     """
     Args:
-        s (str): board. E.g.'Kd3cKc7cTs'
+        cards (tuple(int)): board. E.g. parse_cards('Kd3cKc7cTs')
 
     Returns:
-        Dict of suits freq E.g. {1: ['d', 's'], 3: ['c']}
+        Dict of suits freq E.g. {1: [3, 1], 3: [2]}
     """
 
-    suits = [s[i + 1] for i in range(0, len(s), 2)]
+    suits = [card_suit[c] for c in cards]
     return board_freq(suits)
 
 
-def board_rank_sort(s):
+def board_rank_sort(cards):
     """
     Args:
-        s (str): board. E.g.'Kd3cKc7cTs'
+        cards (tuple(int)): board. E.g. parse_cards('Kd3cKc7cTs')
 
     Returns:
         nums sorted by freq, magnitude e.g. [13, 13, 10, 7, 3]
     """
 
-    nums = [card_toNum[s[i]] for i in range(0, len(s), 2)]
+    nums = [card_rank[c] for c in cards]
     return custom_sort(nums)
 
-# get ranks that have a specific suit
-def get_ranks_by_suit(card_str, suit):
-    ranks = []
-    for i in range(0, len(card_str), 2):
-        rank = card_str[i]
-        card_suit = card_str[i + 1]
-        if card_suit == suit:
-            ranks.append(rank)
-    return ranks
+# get ranks (as ints) that have a specific suit
+def get_nums_by_suit(cards, suit):
+    return [card_rank[c] for c in cards if card_suit[c] == suit]
 
 
 # Check Hand Types
 
 def check_flush(suits_count):
     """
-    Check if flush is present (5 of same suit).
-    Assumes 5 cards
+    Check if flush is present (5+ of same suit).
 
     Args:
-        suits_count(dict): E.g. 1: ['d', 's'], 3: ['c']}
+        suits_count(dict): E.g. {1: [3, 1], 3: [2]}
 
     Returns:
-        bool: True is there is a suit with freq 5
+        bool: True is there is a suit with freq 5+
     """
 
-    return 5 in suits_count.keys()
+    return max(suits_count.keys()) >= 5
 
 # Assumes sorted!!!
 def check_straight(numbers): 
     """
     Check if straight is present (5 consecutive numbers)
-    Assumes 5 cards, sorted in descending order
+    Assumes 5 cards, sorted in descending order (6/7 cards: see score_nums)
 
     Args:
         numbers: E.g. [13, 13, 10, 7, 3]
@@ -179,24 +173,64 @@ def check_pair(nums_count):
     
     return False
 
+def score_nums(score):
+    """
+    Best 5 cards of an evaluator score (see evaluator.py) as custom-sorted ranks,
+    so 6/7 card hands come out the same way as 5 card ones
+
+    Args:
+        score (int): e.g. score_hand(parse_cards('Kd3cKc7cTs2h'))
+
+    Returns:
+        nums: custom-sorted ranks of best 5 cards. E.g. [13, 13, 10, 7, 3]
+    """
+    hand_type = score >> 20
+    r = [((score >> shift) & 15) + 2 for shift in (16, 12, 8, 4, 0)]
+
+    if hand_type in (4, 8):
+        # wheel is 5-high, ace sorts first (same as custom_sort)
+        if r[0] == 5:
+            return [14, 5, 4, 3, 2]
+        return [r[0] - i for i in range(5)]
+
+    if hand_type == 1:
+        return [r[0]] * 2 + r[1:4]
+    if hand_type == 2:
+        return [r[0]] * 2 + [r[1]] * 2 + [r[2]]
+    if hand_type == 3:
+        return [r[0]] * 3 + r[1:3]
+    if hand_type == 6:
+        return [r[0]] * 3 + [r[1]] * 2
+    if hand_type == 7:
+        return [r[0]] * 4 + [r[1]]
+
+    # nothing/flush: top 5 ranks
+    return r
+
 def hand_strength(hand, flop):
     
     '''
     Given flop + hand, determine best hand
 
     Args:
-        hand(str): 'Kd3c'
-        flop(str): 'Kc7cTs'
+        hand(tuple(int)): parse_cards('Kd3c')
+        flop(tuple(int)): parse_cards('Kc7cTs'), or a turn/river board (4/5 cards)
         
 
     Returns:
         hand_type(int): number representing pair, 2 pair...full house etc.
-        nums: custom-sorted ranks
+        nums: custom-sorted ranks (of best 5 cards)
 
         E.g. (1, [13, 13, 10, 7, 3])
     '''
 
     board = hand + flop
+
+    # 6/7 cards: best 5 straight from the evaluator's lookup tables
+    if len(board) > 5:
+        score = score_hand(board)
+        return (score >> 20, score_nums(score))
+
     nums, suits, nums_count, suits_count = board_counts(board)
 
     hand_type = 0
@@ -252,11 +286,11 @@ hand_type_dict= {
 
 
 def trying():
-    hand = 'Kd3c'
-    flop = 'Kc7cTs'
+    hand = parse_cards('Kd3c')
+    flop = parse_cards('Kc7cTs')
 
     board = hand + flop
-    print(board)
+    print(cards_to_str(board))
     nums, suits, nums_count, suits_count = board_counts(board)
     print("Ranks", nums)
     print("Suits", suits)
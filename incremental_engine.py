@@ -0,0 +1,178 @@
+'''
+Incremental range evaluation (grid edits)
+
+main_function's results are means over the range of per-combo rows
+(range_both_tensors / runout tensors). For one hand + flop, IncrementalRange
+keeps every combo's rows once computed, plus running sums over the combos
+currently in the range. Moving to a new range (a cell, row, column or the
+pairs diagonal toggled in the grid) only adds/subtracts the combos that
+changed, and only combos never seen before are evaluated:
+
+    inc = IncrementalRange('QdTd5c', 'AdQc')
+    inc.set_range(Range.from_str('QQ+,AKs'))
+    inc.add(Range.from_str('T9s'))
+    hero_hand_type, result_opp, result_hero, opp_improve_probs, opp_draw_probs = inc.result()
+
+result() is main_function's output for the current range (up to float
+rounding: sums are updated in place rather than re-added from scratch).
+
+precompute() evaluates every combo that doesn't conflict with hand/flop up
+front (e.g. on a background thread while the range is still being edited).
+After that, any range is just a masked sum of stored rows, with no
+opp_stats calls at all.
+'''
+
+from prob_functions import *
+from combo_range import num_combos, combo_cards, blocker_mask
+import threading
+
+progress_chunk_size = 64
+
+
+class IncrementalRange:
+    """
+    Per-combo rows + running sums for one (hand, flop, method)
+
+    Attributes:
+        in_sum ((1326,) bool): combos in the running sums (current range minus blocked combos)
+        computed ((1326,) bool): combos whose rows are known
+    """
+
+    def __init__(self, flop_str, hand_str, method = 'outs'):
+        self.flop = parse_cards(flop_str)
+        self.hand = parse_cards(hand_str)
+        self.exact = method == 'exact' or len(self.flop) > 3
+
+        self.hero_hand_type = hand_strength(self.hand, self.flop)[0]
+
+        # same combos filter_range drops
+        self.playable = ~blocker_mask(*(self.hand + self.flop))
+
+        self.computed = np.zeros(num_combos, dtype = bool)
+        self.in_sum = np.zeros(num_combos, dtype = bool)
+        self.rows = None
+        self.sums = None
+
+        # GUI edits can come from several threads
+        self.lock = threading.Lock()
+
+    def combo_rows(self, combos):
+        """
+        Returns:
+            tuple of (N, ...) arrays, one row per combo (see main_function's passes)
+        """
+        if self.exact:
+            tensors = {3: runout_tensors, 4: river_tensors, 5: showdown_tensors}[len(self.flop)]
+            return tensors(combos, self.flop, self.hand)
+
+        return range_both_tensors(combos, self.flop, self.hand)
+
+    def compute_rows(self, ids, progress = None):
+        """Evaluates the combos in ids that have no rows yet (in chunks, so progress can be reported)"""
+        ids = ids[~self.computed[ids]]
+        if len(ids) == 0:
+            return
+
+        chunks = np.array_split(ids, max(1, len(ids) // progress_chunk_size))
+        done = 0
+
+        for chunk in chunks:
+            rows = self.combo_rows(combo_cards[chunk])
+
+            if self.rows is None:
+                self.rows = [np.zeros((num_combos,) + t.shape[1:]) for t in rows]
+                self.sums = [np.zeros(t.shape[1:]) for t in rows]
+
+            for all_rows, chunk_rows in zip(self.rows, rows):
+                all_rows[chunk] = chunk_rows
+            self.computed[chunk] = True
+
+            # raising from progress leaves the sums untouched (computed rows are kept)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(ids))
+
+    def precompute(self, progress = None):
+        """
+        Evaluates every combo not blocked by hand/flop, one chunk at a time
+        (the lock is only held per chunk, so set_range/result can run in between)
+
+        Args:
+            progress (callable): progress(done, total) after each chunk.
+                                 Raising from it stops (rows computed so far are kept)
+        """
+        ids = np.flatnonzero(self.playable & ~self.computed)
+        if len(ids) == 0:
+            return
+
+        chunks = np.array_split(ids, max(1, len(ids) // progress_chunk_size))
+        done = 0
+
+        for chunk in chunks:
+            with self.lock:
+                self.compute_rows(chunk)
+
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(ids))
+
+    def set_range(self, r, progress = None):
+        """
+        Moves the running sums to range r: only combos added or removed since the
+        last call are touched
+
+        Args:
+            r (Range)
+            progress (callable): progress(done, total) as new combos are evaluated.
+                                 Raising from it cancels the update (range stays as it was)
+        """
+        with self.lock:
+            mask = r.mask & self.playable
+
+            added = np.flatnonzero(mask & ~self.in_sum)
+            removed = np.flatnonzero(self.in_sum & ~mask)
+
+            self.compute_rows(added, progress)
+
+            if len(added) == 0 and len(removed) == 0:
+                return
+
+            for sums, rows in zip(self.sums, self.rows):
+                sums += rows[added].sum(axis = 0)
+                sums -= rows[removed].sum(axis = 0)
+
+            self.in_sum = mask
+
+            # start from exact zeros again (no rounding left over from removed combos)
+            if not mask.any():
+                for sums in self.sums:
+                    sums[...] = 0
+
+    def add(self, r, progress = None):
+        """Adds the combos of r (e.g. one grid cell) to the range"""
+        self.set_range(Range(self.in_sum | r.mask), progress)
+
+    def remove(self, r):
+        """Removes the combos of r from the range"""
+        self.set_range(Range(self.in_sum & ~r.mask))
+
+    def __len__(self):
+        """# of combos in the sums (range minus combos blocked by hand/flop)"""
+        return int(np.count_nonzero(self.in_sum))
+
+    def result(self):
+        """
+        Returns:
+            same as main_function (for the current range), -1's if it's empty
+        """
+        with self.lock:
+            n = len(self)
+            if n == 0:
+                return -1, -1, -1, -1, -1
+
+            means = [sums / n for sums in self.sums]
+
+        result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp = means[:4]
+        opp_improve_probs = improve_probs(self.hero_hand_type, result_opp, avg_higher_pair_opp)
+
+        return self.hero_hand_type, result_opp, result_hero, opp_improve_probs, avg_is_draw_opp
@@ -1,6 +1,12 @@
 import tkinter as tk
+from prob_functions import *
 from validity_check import *
+from combo_range import Range, hand_class_mask
+from incremental_engine import IncrementalRange
 from tkinter import ttk
+import threading
+import logging
+import queue
 import time
 
 root = tk.Tk()
@@ -57,9 +63,9 @@ explain_text_label = tk.Label(
 )
 explain_text_label.pack(anchor='w')
 
-# range object
+# range object (1326-slot mask, see combo_range.py)
 global opp_range
-opp_range = set()
+opp_range = Range()
 
 global on_offs
 on_offs = [[False for i in range(13)] for j in range(13)]
@@ -67,33 +73,54 @@ on_offs = [[False for i in range(13)] for j in range(13)]
 global hand_table
 hand_table = []    
 
-def card_command(i: int, j:int):
-    global hand_table
+# cell_masks[i][j]: combos of grid cell (i, j), built once after the grid (see below)
+cell_masks = None
+
+def cell_color(i, j):
+    if i == j:
+        return '#D3DECD'
+    elif i < j:
+        return '#F1E5C9'
+    return '#DDE2F7'
+
+def set_cells(cells, on):
+    """
+    Turns grid cells on/off: one mask op on opp_range, then only the 
+    buttons whose state actually changes are redrawn
+
+    Args:
+        cells: list of (i, j)
+        on (bool)
+    """
     global opp_range
     global on_offs
-    global buttons
-
-    cards = parse_range(hand_table[i][j])
 
-    if not on_offs[i][j]:
-        opp_range.update(cards)
-        on_offs[i][j] = True
-        
-        buttons[i][j].config(bg = 'white', underline = 1, border = 2)
-        range_count_label.config(text = f"Cards in range: {len(opp_range)}")
+    rows, cols = zip(*cells)
+    cells_range = Range(cell_masks[list(rows), list(cols)].any(axis = 0))
 
+    if on:
+        opp_range |= cells_range
     else:
-        opp_range = opp_range.difference(cards)
-        on_offs[i][j] = False
+        opp_range -= cells_range
 
-        if i == j:
-            buttons[i][j].config(bg = '#D3DECD', underline = -1, border = 2)
-        elif i < j:
-            buttons[i][j].config(bg = '#F1E5C9', underline = -1, border = 2)
+    for i, j in cells:
+        if on_offs[i][j] == on:
+            continue
+
+        on_offs[i][j] = on
+        if on:
+            buttons[i][j].config(bg = 'white', underline = 1, border = 2)
         else:
-            buttons[i][j].config(bg = '#DDE2F7', underline = -1, border = 2)
+            buttons[i][j].config(bg = cell_color(i, j), underline = -1, border = 2)
+
+    range_count_label.config(text = f"Cards in range: {len(opp_range)}")
 
-        range_count_label.config(text = f"Cards in range: {len(opp_range)}")
+    # once odds are shown, grid edits refresh them (only the changed combos are evaluated)
+    if live_results:
+        calculate_probs()
+
+def card_command(i: int, j:int):
+    set_cells([(i, j)], not on_offs[i][j])
 
 # Start grid from row=1 instead of 0
 for i, row_rank in enumerate(ranks):
@@ -121,46 +148,17 @@ for i, row_rank in enumerate(ranks):
     hand_table.append(row_hand_strs)
     buttons.append(row_buttons)
 
+cell_masks = np.array([[hand_class_mask(hand) for hand in row] for row in hand_table])
+
 """ --- Multiple button control --- """
 # Column control
 col_on_offs = [False] * 13  # Tracks if each column is ON or OFF
 def col_control_command(j):  # j = column index
-    global opp_range
     global col_on_offs
-    global on_offs
-    global hand_table
-
-    if not col_on_offs[j]:
-        # Turn ON all buttons in this column
-        col_on_offs[j] = True
-
-        for i in range(13):  # each row
 
-            if i > j:
-                on_offs[i][j] = True
-                opp_range.update(parse_range(hand_table[i][j]))
-
-                # color 
-                buttons[i][j].config(bg = 'white', underline = 1, border = 2)
-
-        range_count_label.config(text = f"Cards in range: {len(opp_range)}")
-
-
-    else:
-        # Turn OFF all buttons in this column
-        col_on_offs[j] = False
-
-        for i in range(13):  # each row
-            
-            if i > j:
-
-                on_offs[i][j] = False
-                opp_range.difference_update(parse_range(hand_table[i][j]))
-                
-                # color
-                buttons[i][j].config(bg = '#DDE2F7', underline = -1, border = 2)
-
-        range_count_label.config(text = f"Cards in range: {len(opp_range)}")
+    # offsuit cells below the diagonal
+    col_on_offs[j] = not col_on_offs[j]
+    set_cells([(i, j) for i in range(j + 1, 13)], col_on_offs[j])
 
 
 # Buttons to press each row
@@ -181,44 +179,11 @@ for col in range(12):
 # Row control
 row_on_offs = [False] * 13  # Tracks if each row is ON or OFF
 def row_control_command(i):  # i = row index
-    global opp_range
     global row_on_offs
-    global on_offs
-    global hand_table
-
-    if not row_on_offs[i]:
-        # Turn ON all buttons in this row
-        row_on_offs[i] = True
-
-        for j in range(13):  # each column
-        
-            # OFF SUIT 
-            if i < j:
 
-                on_offs[i][j] = True
-                opp_range.update(parse_range(hand_table[i][j]))
-
-                # Color
-                buttons[i][j].config(bg='white', underline=1, border=2)
-
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
-
-
-    else:
-        # Turn OFF all buttons in this row
-        row_on_offs[i] = False
-
-        for j in range(13):  # each column
-
-            if i < j:
-
-                on_offs[i][j] = False
-                opp_range.difference_update(parse_range(hand_table[i][j]))
-
-                # Restore original color
-                buttons[i][j].config(bg='#F1E5C9', underline=-1, border=2)
-            
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
+    # suited cells above the diagonal
+    row_on_offs[i] = not row_on_offs[i]
+    set_cells([(i, j) for j in range(i + 1, 13)], row_on_offs[i])
 
 
 for row in range(12):
@@ -239,28 +204,9 @@ diag_on = False  # Tracks whether the diagonal is selected
 
 def diag_control_command():
     global diag_on
-    global opp_range
-    global on_offs
-    global hand_table
-
-    if not diag_on:
-        diag_on = True
-        for i in range(13):
-            on_offs[i][i] = True
-            opp_range.update(parse_range(hand_table[i][i]))
-            buttons[i][i].config(bg='white', underline=1, border=2)
 
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
-
-
-    else:
-        diag_on = False
-        for i in range(13):
-            on_offs[i][i] = False
-            opp_range.difference_update(parse_range(hand_table[i][i]))
-            buttons[i][i].config(bg='#D3DECD', underline=-1, border=2)
-
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
+    diag_on = not diag_on
+    set_cells([(i, i) for i in range(13)], diag_on)
 
 
 diag_button = tk.Button(
@@ -276,53 +222,16 @@ diag_button.grid(row=15, column=13, padx=5, pady=1)
 grid_on = False  # Tracks if entire grid is ON or OFF
 def grid_control_command():
     global grid_on
-    global opp_range
-    global on_offs
-    global hand_table
-
     global row_on_offs
     global col_on_offs
     global diag_on
 
-    if not grid_on:
-
-        grid_on = True
-        row_on_offs = [True] * 13
-        col_on_offs = [True] * 13
-        diag_on = True
-
-        for i in range(13):
-            for j in range(13):
-                on_offs[i][j] = True
-                opp_range.update(parse_range(hand_table[i][j]))
-                buttons[i][j].config(bg='white', underline=1, border=2)
-
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
-
-
-    else:
-        grid_on = False
-        grid_on = False
-        row_on_offs = [False] * 13
-        col_on_offs = [False] * 13
-        diag_on = False
-
-        for i in range(13):
-            for j in range(13):
-                on_offs[i][j] = False
-                opp_range.difference_update(parse_range(hand_table[i][j]))
+    grid_on = not grid_on
+    row_on_offs = [grid_on] * 13
+    col_on_offs = [grid_on] * 13
+    diag_on = grid_on
 
-                # Reset to original color based on type
-                if i == j:
-                    bg = '#D3DECD'
-                elif i < j:
-                    bg = '#F1E5C9'
-                else:
-                    bg = '#DDE2F7'
-
-                buttons[i][j].config(bg=bg, underline=-1, border=2)
-
-        range_count_label.config(text=f"Cards in range: {len(opp_range)}")
+    set_cells([(i, j) for i in range(13) for j in range(13)], grid_on)
 
 
 grid_button = tk.Button(
@@ -343,10 +252,16 @@ can_calculate = False
 flop_str = ''
 hand_str = ''
 
+# per-combo rows + running sums for the configured hand/flop (see incremental_engine.py)
+incremental_range = None
+live_results = False
+
 def validity_command():
     global flop_str
     global hand_str
     global can_calculate
+    global incremental_range
+    global live_results
 
     # get items from box
     msg = ''
@@ -404,6 +319,16 @@ def validity_command():
         flop_str = candidate_flop_str
         can_calculate = True
 
+        incremental_range = IncrementalRange(flop_str, hand_str)
+        live_results = False
+
+        # a calculation still running is for the old spot: drop its results
+        stop_calculation()
+        calculate_label.config(text = "")
+
+        # use the time spent editing the range: evaluate every combo now (cancels the previous spot's job)
+        start_precompute(incremental_range)
+
         msg = f"Hand: {hand_str} \t Flop: {flop_str}"
         validity_label.config(text = msg)
 
@@ -442,13 +367,125 @@ result_opp = np.array([])
 
 """ --- Calculate probabilities --- """
 
+""" --- Background calculation --- 
+
+The range is evaluated (incrementally, see incremental_engine.py: only combos
+added/removed since the last calculation) on a worker thread so the window doesn't freeze. 
+The worker never touches widgets: it puts progress/results on calc_queue, 
+and poll_calc_queue (run by root.after on the Tk thread) updates the GUI.
+
+Every request gets a new calc_id. Older requests (superseded, cancelled, or for
+a spot that has since been reconfigured) stop at their next progress update,
+and anything they already queued is ignored.
+
+Configuring a spot also starts a precompute thread that evaluates every combo
+(IncrementalRange.precompute), so by the time "Calculate odds" is pressed the
+range is only a masked sum. A new configuration gets a new precompute_id,
+which stops the previous spot's thread the same way.
+"""
+
+class CalculationCancelled(Exception):
+    pass
+
+calc_queue = queue.Queue()
+calc_id = 0
+precompute_id = 0
+
+def precompute_worker(my_id, inc):
+    def progress(done, total):
+        if my_id != precompute_id:
+            raise CalculationCancelled()
+
+    try:
+        inc.precompute(progress)
+
+    except CalculationCancelled:
+        pass
+
+    # "Calculate odds" computes whatever is missing (and reports errors)
+    except Exception:
+        logging.getLogger(__name__).exception('Precompute failed')
+
+
+def start_precompute(inc):
+    global precompute_id
+
+    precompute_id += 1
+    worker = threading.Thread(target = precompute_worker, args = (precompute_id, inc), daemon = True)
+    worker.start()
+
+def calculation_worker(my_id, inc, r):
+    def progress(done, total):
+        if my_id != calc_id:
+            raise CalculationCancelled()
+        calc_queue.put((my_id, 'progress', done / total))
+
+    start_time = time.time()
+    try:
+        inc.set_range(r, progress)
+        result = inc.result()
+        calc_queue.put((my_id, 'done', (result, time.time() - start_time)))
+
+    except CalculationCancelled:
+        pass
+
+    except Exception as e:
+        calc_queue.put((my_id, 'error', e))
+
+
+def poll_calc_queue():
+    while True:
+        try:
+            msg_id, kind, payload = calc_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        # stale message from a superseded/cancelled request
+        if msg_id != calc_id:
+            continue
+
+        if kind == 'progress':
+            progress_bar['value'] = payload * 100
+            calculate_label.config(text = f"Calculating... {payload * 100:.0f}%")
+
+        elif kind == 'done':
+            result, elapsed_time = payload
+            progress_bar['value'] = 100
+            cancel_button.config(state = 'disabled')
+            show_results(*result)
+
+            print(f"Function execution time: {elapsed_time:.4f} seconds")
+
+        elif kind == 'error':
+            progress_bar['value'] = 0
+            cancel_button.config(state = 'disabled')
+            calculate_label.config(text = f"Error: {payload}")
+
+    root.after(50, poll_calc_queue)
+
+
+def stop_calculation():
+    global calc_id
+
+    # worker sees a different id at its next progress update and stops
+    calc_id += 1
+
+    progress_bar['value'] = 0
+    cancel_button.config(state = 'disabled')
+
+
+def cancel_command():
+    stop_calculation()
+    calculate_label.config(text = "Calculation cancelled")
+
+
 def calculate_probs():
     global flop_str
     global hand_str
     global opp_range
     global can_calculate
-
-    global result_opp
+    global calc_id
+    global live_results
 
     if not can_calculate:
         calculate_label.config(text = "Please configure flop/hand")
@@ -460,11 +497,27 @@ def calculate_probs():
         hand_type_label.config(text = "", font=("Helvetica", 10, "bold"))
         return
 
-    """ --- Calculating stats --- """
-    calculate_label.config(text = "")
+    """ --- Calculating stats (in background) --- """
+    # new request supersedes whatever is still running
+    calc_id += 1
 
-    start_time = time.time()
-    hero_hand_type, result_opp, result_hero, opp_improve_probs, opp_draw_probs = main_function(opp_range, flop_str, hand_str)
+    progress_bar['value'] = 0
+    cancel_button.config(state = 'normal')
+    calculate_label.config(text = "Calculating...")
+
+    # worker gets a copy, so range edits during the calculation don't affect it
+    worker = threading.Thread(target = calculation_worker, args = (calc_id, incremental_range, opp_range.copy()),
+                              daemon = True)
+    worker.start()
+
+    live_results = True
+
+
+def show_results(hero_hand_type, new_result_opp, result_hero, opp_improve_probs, opp_draw_probs):
+    global result_opp
+
+    result_opp = new_result_opp
+    calculate_label.config(text = "")
     
     # make sure opp range is not empty
     if type(result_opp) == int:
@@ -486,13 +539,9 @@ def calculate_probs():
     
     hero_hand_type_str = hand_type_dict[hero_hand_type]
 
-    elapsed_time = time.time() - start_time
-    print(f"Function execution time: {elapsed_time:.4f} seconds")
-
-
-    # determine if straight/flush draw
-    hero_is_straight_draw = int(result_hero[1][4] > 0)
-    hero_is_flush_draw = int(result_hero[1][5] > 0)
+    # determine if straight/flush draw (next street, none on the river)
+    hero_is_straight_draw = int(len(result_hero) > 1 and result_hero[1][4] > 0)
+    hero_is_flush_draw = int(len(result_hero) > 1 and result_hero[1][5] > 0)
 
     if hero_hand_type_str == "none":
         if hero_is_straight_draw:
@@ -523,6 +572,9 @@ def calculate_probs():
     result_opp_transpose = result_opp.transpose()
     result_hero_transpose = result_hero.transpose()
 
+    # turn/river boards: no flop (turn) column
+    skipped = ['-'] * (len(col_labels) - len(result_opp))
+
     hand_type_label.config(text = f"Hand type: {hero_hand_type_str}", font=("Helvetica", 10, "bold"))
 
     """ --- Update the villain table --- """
@@ -531,7 +583,7 @@ def calculate_probs():
 
     for i, row in enumerate(result_opp_transpose):
         formatted_row = [f"{val * 100:.1f}%" for val in row]  # Convert to percentages
-        opp_tree.insert("", "end", values=(row_labels[i], *formatted_row))
+        opp_tree.insert("", "end", values=(row_labels[i], *skipped, *formatted_row))
 
     """ --- Update the hero table --- """
     for item in hero_tree.get_children():
@@ -539,7 +591,7 @@ def calculate_probs():
 
     for i, row in enumerate(result_hero_transpose):
         formatted_row = [f"{val * 100:.1f}%" for val in row]  # Convert to percentages
-        hero_tree.insert("", "end", values=(row_labels[i], *formatted_row))
+        hero_tree.insert("", "end", values=(row_labels[i], *skipped, *formatted_row))
 
     """ --- Update the improve table --- """
     for item in improve_tree.get_children():
@@ -549,10 +601,10 @@ def calculate_probs():
     relative_strength = hero_no_improve_probs * opp_improve_probs
 
     villain_strength_formatted = [f"{val * 100:.1f}%" for val in opp_improve_probs]  # Convert to percentages
-    improve_tree.insert("", "end", values=(scenarios[0], *villain_strength_formatted))
+    improve_tree.insert("", "end", values=(scenarios[0], *skipped, *villain_strength_formatted))
 
     relative_strength_formatted = [f"{val * 100:.1f}%" for val in relative_strength]  # Convert to percentages
-    improve_tree.insert("", "end", values=(scenarios[1], *relative_strength_formatted))
+    improve_tree.insert("", "end", values=(scenarios[1], *skipped, *relative_strength_formatted))
 
     """ --- Display their straight flush draw probs"""
     opp_straight_draw_prob, opp_flush_draw_prob = opp_draw_probs[0], opp_draw_probs[1]
@@ -564,9 +616,15 @@ def calculate_probs():
 calculate_button = tk.Button(right_frame, text="Calculate odds", activebackground="red", command = calculate_probs)
 calculate_button.grid(row=row_offset + 5, column=side_col, padx = 20, pady=5, sticky='w')
 
+cancel_button = tk.Button(right_frame, text="Cancel", state = 'disabled', command = cancel_command)
+cancel_button.grid(row=row_offset + 5, column=side_col + 1, padx = 0, pady=5, sticky='w')
+
 calculate_label = tk.Label(right_frame, text="")
 calculate_label.grid(row=row_offset + 6, column=side_col, padx = 20, pady=5, sticky='w')
 
+progress_bar = ttk.Progressbar(right_frame, orient = 'horizontal', length = 150, mode = 'determinate', maximum = 100)
+progress_bar.grid(row=row_offset + 6, column=side_col + 1, padx = 0, pady=5, sticky='w')
+
 hand_type_label = tk.Label(right_frame, text="")
 hand_type_label.grid(row=row_offset + 7, column=side_col, padx = 20, pady=5, sticky='w')
 
@@ -620,5 +678,6 @@ for col in col_labels:
 draw_label = tk.Label(right_frame, text="")
 draw_label.grid(row=row_offset + 13, column=side_col, padx = 20, pady=5, sticky='w')
 
+root.after(50, poll_calc_queue)
 root.mainloop()
 
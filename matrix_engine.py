@@ -0,0 +1,165 @@
+'''
+Range vs range equity matrix (exact turn + river runouts)
+
+For a hero range and a villain range on a flop, gives hero's equity against
+every villain combo (hero combo x villain combo matrix), by showdown on every
+turn + river pair. Work shared by all pairs:
+
+- the 1176 runout boards (2 of the 49 cards not on the flop) are built once,
+  and every combo (hero or villain, each only once) is scored on all of them
+  (runout_engine's rank-pair + flush tables)
+- a combo that uses a runout card gets a sentinel score there; per runout,
+  scores are squashed to dense ranks so they fit in int16
+- a hero combo's row is then one vectorized compare against all villain combos
+  x all runouts. Runouts blocked for only one of the 2 combos are fixed up
+  afterwards with 2 matrix products of the (combo x runout) blocked masks
+
+Pairs that share a card are masked out (nan in the equity matrix). Any 2
+disjoint combos see the same number of runouts (45 choose 2 = 990).
+
+Hero rows are independent, so big matrices are split across a process pool
+(see parallel_engine.py).
+'''
+
+from runout_engine import *
+from parallel_engine import get_pool, chunks_per_worker
+from combo_range import combo_cards, combo_index
+import os
+
+runouts_per_pair = 990
+rows_per_block = 4
+min_rows_per_task = 16
+
+
+def flop_runouts(flop):
+    """
+    Returns:
+        (1176, 2) int array: every turn + river pair of cards not on flop
+    """
+    deck = np.array(sorted(full_deck.difference(flop)), dtype = np.int64)
+    return deck[np.array(list(itertools.combinations(range(len(deck)), 2)), dtype = np.int64)]
+
+
+def runout_ranks(combos, flop, runouts):
+    """
+    Args:
+        combos: (N, 2) int array (sorted within each combo, none on the flop)
+        flop (tuple(int))
+        runouts: (R, 2) int array, see flop_runouts
+
+    Returns:
+        ranks: (N, R) int16 array, per runout: 0 if combo uses a runout card,
+               else dense rank of its score (higher = better)
+        blocked: (N, R) bool array, combo uses a runout card
+    """
+    flop_rc, flop_sm = hand_counts(np.array([flop]))
+    river_rc, river_sm = hand_counts(runouts)
+    river_rc, river_sm = river_rc + flop_rc, river_sm | flop_sm
+
+    scores = combo_scores(rank_pair_scores(river_rc), river_sm, combos)
+
+    blocked = np.zeros((len(combos), len(runouts)), dtype = bool)
+    for col in range(2):
+        blocked |= (combos[:, 0][:, None] == runouts[:, col][None]) | (combos[:, 1][:, None] == runouts[:, col][None])
+
+    scores = np.where(blocked, -1, scores)
+
+    # dense ranks per runout: unique over (runout, score) keys, minus where each runout starts
+    keys = np.arange(len(runouts))[None] << 24 | (scores + 1)
+    uniq, inverse = np.unique(keys, return_inverse = True)
+    starts = np.searchsorted(uniq >> 24, np.arange(len(runouts)))
+    ranks = inverse.reshape(keys.shape) - starts[None]
+
+    return ranks.astype(np.int16), blocked
+
+
+def pair_counts(hero_ranks, villain_ranks):
+    """
+    Worker task: raw win/tie counts of some hero rows vs all villain combos
+    (runouts blocked for either combo not excluded yet, see matrix_counts)
+
+    Args:
+        hero_ranks: (H, R) int16, villain_ranks: (V, R) int16 (see runout_ranks)
+
+    Returns:
+        wins, ties: (H, V) int32 arrays
+    """
+    h, v = len(hero_ranks), len(villain_ranks)
+    wins = np.zeros((h, v), dtype = np.int32)
+    ties = np.zeros((h, v), dtype = np.int32)
+
+    buf = np.empty((rows_per_block, v, hero_ranks.shape[1]), dtype = bool)
+
+    for start in range(0, h, rows_per_block):
+        block = hero_ranks[start: start + rows_per_block, None, :]
+        out = buf[:len(block)]
+
+        np.greater(block, villain_ranks[None], out = out)
+        wins[start: start + len(block)] = np.count_nonzero(out, axis = 2)
+
+        np.equal(block, villain_ranks[None], out = out)
+        ties[start: start + len(block)] = np.count_nonzero(out, axis = 2)
+
+    return wins, ties
+
+
+def matrix_counts(hero_combos, villain_combos, flop, executor = None, workers = None):
+    """
+    Exact win/tie counts of every hero combo vs every villain combo
+
+    Args:
+        hero_combos, villain_combos: (N, 2) int arrays (sorted within each combo, none on the flop)
+        flop (tuple(int)): e.g. parse_cards('QdTd5c')
+        executor, workers: split hero rows across a process pool (see parallel_engine.range_means)
+
+    Returns:
+        wins, ties: (Nh, Nv) int arrays, out of runouts_per_pair runouts
+        valid: (Nh, Nv) bool array, False if the 2 combos share a card
+    """
+    runouts = flop_runouts(flop)
+
+    # every distinct combo is scored once, even if it's in both ranges
+    hero_ids = combo_index[hero_combos[:, 0], hero_combos[:, 1]]
+    villain_ids = combo_index[villain_combos[:, 0], villain_combos[:, 1]]
+    ids, inverse = np.unique(np.concatenate([hero_ids, villain_ids]), return_inverse = True)
+
+    ranks, blocked = runout_ranks(combo_cards[ids], flop, runouts)
+    hero_rows, villain_rows = inverse[:len(hero_ids)], inverse[len(hero_ids):]
+
+    hero_ranks, villain_ranks = ranks[hero_rows], ranks[villain_rows]
+
+    parallel = executor is not None or (workers is not None and workers > 1)
+
+    if parallel:
+        if executor is None:
+            executor = get_pool(workers)
+        num_workers = getattr(executor, '_max_workers', None) or workers or os.cpu_count()
+
+        num_tasks = max(1, min(num_workers * chunks_per_worker, len(hero_ranks) // min_rows_per_task))
+        bounds = np.linspace(0, len(hero_ranks), num_tasks + 1).astype(int)
+        futures = [executor.submit(pair_counts, hero_ranks[a: b], villain_ranks) for a, b in zip(bounds, bounds[1:])]
+
+        try:
+            results = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        wins = np.concatenate([w for w, t in results])
+        ties = np.concatenate([t for w, t in results])
+    else:
+        wins, ties = pair_counts(hero_ranks, villain_ranks)
+
+    # blocked runouts have rank 0: a hero combo "beat" every runout blocked for villain only,
+    # and "tied" every runout blocked for both
+    hero_blocked = blocked[hero_rows].astype(np.float32)
+    villain_blocked = blocked[villain_rows].astype(np.float32)
+
+    wins = wins - ((1 - hero_blocked) @ villain_blocked.T).astype(np.int32)
+    ties = ties - (hero_blocked @ villain_blocked.T).astype(np.int32)
+
+    shared = hero_combos[:, None, :, None] == villain_combos[None, :, None, :]
+    valid = ~shared.any(axis = (2, 3))
+
+    return wins, ties, valid
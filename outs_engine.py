@@ -0,0 +1,650 @@
+'''
+Outs math: closed-form probabilities of villain's hand types on flop/turn/river
+
+Computed with array ops over N rows (one per villain combo) at once;
+opp_stats (a single combo) is a 1-row call into the same code:
+
+- outs and seen cards are uint64 card masks (same 52-bit layout as
+  draw_stats_prototype's masks), counted with count (a popcount)
+- the deck (cards left per rank, cards left) is an (N, 15) / (N,) array
+- each hand type's branches are np.where's over the rows
+
+Straight and straight flush draws only depend on ranks (villain's 2 ranks +
+the flop's, or the ranks of the flush suit), so their draw sets are worked out
+once per rank pattern by draw_stats_prototype's straight helpers (cached, at
+most 91 rank pairs per flop), and gathered into (N, K, 2) arrays of draw pairs.
+
+Rows can also be hero's stats vs each combo (see range_engine.range_prob_tensor):
+"opp" is always the player whose stats these are, "hero" the other player.
+'''
+
+from draw_stats_prototype import *
+from profiling import stage
+from functools import lru_cache
+import numpy as np
+
+card_rank_arr = np.array(card_rank, dtype = np.int64)
+card_suit_arr = np.array(card_suit, dtype = np.int64)
+
+card_bits = np.array(card_bit, dtype = np.uint64)
+rank_masks = np.array(rank_mask, dtype = np.uint64)
+suit_masks = np.array(suit_mask, dtype = np.uint64)
+
+# sets of ranks as ints: bit num (2..14)
+all_rank_bits = sum(1 << num for num in all_nums)
+
+place_values = 16 ** np.arange(4, -1, -1)
+
+
+# popcount of every byte value (numpy < 2.0 has no np.bitwise_count)
+byte_counts = np.array([bin(b).count('1') for b in range(256)], dtype = np.int64)
+
+
+def count(masks):
+    """popcount of each mask"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int64)
+
+    masks = np.asarray(masks, dtype = np.uint64)
+    masks_bytes = np.ascontiguousarray(masks.reshape(-1)).view(np.uint8).reshape(masks.shape + (8,))
+    return byte_counts[masks_bytes].sum(axis = -1)
+
+
+def has_card(masks, cards):
+    """masks & card_bit[cards] != 0, cards: int array (clipped to 0..51)"""
+    return (masks >> np.clip(cards, 0, 51).astype(np.uint64)) & np.uint64(1) != 0
+
+
+def card_of(nums, suits):
+    """make_card per row (num 1 = low ace)"""
+    return (np.where(nums == 1, 14, nums) - 2) * 4 + suits
+
+
+def rank_cards(nums):
+    """Mask of the 4 cards of each num (0 --> no cards)"""
+    return np.where(nums > 0, rank_masks[np.clip(nums, 0, 14)], np.uint64(0))
+
+
+def mask_rank_bits(masks):
+    """Ranks with at least 1 card in each mask, as rank bits"""
+    res = np.zeros(len(masks), dtype = np.int64)
+    for num in all_nums:
+        res |= np.where(masks & rank_masks[num] != 0, 1 << num, 0)
+    return res
+
+
+def turn_probs_of(outs, cards_left):
+    """Prob of hitting 1 of outs on the turn"""
+    return count(outs)/cards_left
+
+
+def river_probs_of(outs, cards_left):
+    """Prob of hitting 1 of outs by the river (turn, or miss then river)"""
+    num_outs = count(outs)
+
+    connect_on_turn = num_outs/cards_left
+    connect_on_river = (1 - connect_on_turn) * (num_outs/(cards_left - 1))
+
+    return connect_on_turn + connect_on_river
+
+
+def add_to_river_of(outs, flush_outs, straight_outs, cards_left):
+    """
+    Extra prob of hitting outs on the river only: the turn misses every outs
+    (incl. flush/straight outs, counted separately) and the river hits
+    """
+    first_miss = np.uint64(deck_mask) & ~(flush_outs | straight_outs | outs)
+    return (count(first_miss)/cards_left)*(count(outs)/(cards_left - 1))
+
+
+""" --- Draw tables (per rank pattern) --- """
+
+def pop_order(sets):
+    """Elements of a set of frozensets (in pop order), as tuples"""
+    res = []
+    while sets:
+        res.append(tuple(sets.pop()))
+    return res
+
+
+def straight_gutshot_pairs(opp_nums, flop_nums, restricted_ranks):
+    """Pairs of ranks that together (turn + river) make a straight with opp_nums, excluding restricted_ranks"""
+    opp_nums = list(opp_nums)
+    if 14 in opp_nums:
+        opp_nums.append(1)
+
+    nums = opp_nums + list(flop_nums)
+
+    unwanted_nums = set(nums)
+    unwanted_nums.update(set(restricted_ranks))
+
+    return pop_order(filter_pairs(straight_draws_river(nums, opp_nums), unwanted_nums))
+
+
+def straightflush_gutshot_pairs(opp_nums, flop_nums, restricted_ranks):
+    """Same as straight_gutshot_pairs, for the ranks of the flush suit"""
+    opp_nums, flop_nums = list(opp_nums), list(flop_nums)
+
+    restricted_nums = list(restricted_ranks)
+    if 14 in restricted_nums:
+        restricted_nums.append(1)
+
+    if 14 in opp_nums:
+        opp_nums.append(1)
+    elif 14 in flop_nums:
+        flop_nums.append(1)
+
+    nums = opp_nums + flop_nums
+    unwanted_nums = set(nums)
+    unwanted_nums.update(set(restricted_nums))
+
+    return pop_order(filter_pairs(straight_draws_river(nums, opp_nums), unwanted_nums))
+
+
+@lru_cache(maxsize = 8192)
+def straight_draw_table(opp_nums, flop_nums):
+    """
+    Rank-only part of the straight probs for villain's ranks opp_nums
+
+    Returns:
+        one_card_outs (int): mask of 1-card straight outs (any suit, seen cards not removed)
+        pairs (List[tuple]): gutshot draw pairs if there are 1-card outs (those ranks excluded)
+        pairs_no_outs (List[tuple]): gutshot draw pairs otherwise
+    """
+    one_card_outs, one_card_ranks = straight_one_outs(list(opp_nums), list(flop_nums), 0)
+
+    return (one_card_outs, straight_gutshot_pairs(opp_nums, flop_nums, one_card_ranks),
+            straight_gutshot_pairs(opp_nums, flop_nums, []))
+
+
+@lru_cache(maxsize = 8192)
+def straight_flush_draw_table(opp_nums, flop_nums):
+    """
+    Rank-only part of the straight flush probs (ranks of the flush suit in villain's hand/on the flop)
+
+    Returns:
+        same as straight_draw_table (one_card_outs of any suit)
+    """
+    existing_nums = list(opp_nums) + list(flop_nums)
+    if 14 in existing_nums:
+        existing_nums.append(1)
+
+    outs_nums = straight_draws_turn(existing_nums)
+    outs_ranks = [n for n in outs_nums if n != 1]
+    if 1 in outs_nums:
+        outs_ranks.append(14)
+
+    return (get_valid_outs(0, outs_ranks), straightflush_gutshot_pairs(opp_nums, flop_nums, outs_ranks),
+            straightflush_gutshot_pairs(opp_nums, flop_nums, []))
+
+
+def clear_draw_tables():
+    straight_draw_table.cache_clear()
+    straight_flush_draw_table.cache_clear()
+
+
+def gather_tables(keys, table_of):
+    """
+    Looks up a draw table per row (once per distinct key)
+
+    Args:
+        keys: (N,) int array
+        table_of (callable): key --> (one_card_outs, pairs, pairs_no_outs)
+
+    Returns:
+        one_card_outs: (N,) uint64 array
+        pairs, pairs_no_outs: (N, K, 2) int arrays (0-padded)
+        num_pairs, num_pairs_no_outs: (N,) int arrays
+    """
+    uniq, inverse = np.unique(keys, return_inverse = True)
+    tables = [table_of(int(key)) for key in uniq]
+
+    k = max([1] + [len(t[1]) for t in tables] + [len(t[2]) for t in tables])
+    outs = np.zeros(len(uniq), dtype = np.uint64)
+    pairs = np.zeros((2, len(uniq), k, 2), dtype = np.int64)
+    num_pairs = np.zeros((2, len(uniq)), dtype = np.int64)
+
+    for i, (one_card_outs, *pair_lists) in enumerate(tables):
+        outs[i] = one_card_outs
+        for j, pair_list in enumerate(pair_lists):
+            if pair_list:
+                pairs[j, i, :len(pair_list)] = pair_list
+            num_pairs[j, i] = len(pair_list)
+
+    return outs[inverse], pairs[0][inverse], pairs[1][inverse], num_pairs[0][inverse], num_pairs[1][inverse]
+
+
+def select_pairs(cond, pairs, num_pairs, pairs_no_outs, num_pairs_no_outs):
+    return np.where(cond[:, None, None], pairs, pairs_no_outs), np.where(cond, num_pairs, num_pairs_no_outs)
+
+
+""" --- Hand types --- """
+
+def straight_gutshot_probs(pairs, num_pairs, rank_left, cards_left, turn_suit_flush, river_suit_flush, flush_draw_outs):
+    """
+    Prob of hitting both ranks of a draw pair on turn + river (either order),
+    summed over each row's draw pairs. Excludes runouts that would make a flush
+    """
+    rows = np.arange(len(pairs))
+    total = np.zeros(len(pairs))
+
+    turn_flush = turn_suit_flush >= 0
+    river_flush = ~turn_flush & (river_suit_flush >= 0)
+
+    for k in range(pairs.shape[1]):
+        num1, num2 = pairs[:, k, 0], pairs[:, k, 1]
+        counts1, counts2 = rank_left[rows, num1], rank_left[rows, num2]
+
+        # remove flush suit
+        counts1 = counts1 - (turn_flush & has_card(flush_draw_outs, card_of(num1, turn_suit_flush)))
+        counts2 = counts2 - (turn_flush & has_card(flush_draw_outs, card_of(num2, turn_suit_flush)))
+
+        both_flush = (river_flush & has_card(flush_draw_outs, card_of(num1, river_suit_flush))
+                      & has_card(flush_draw_outs, card_of(num2, river_suit_flush)))
+
+        counts1 = np.maximum(counts1, 0)
+        counts2 = np.maximum(counts2, 0)
+
+        prob = 2 * (counts1/cards_left) * (counts2/(cards_left - 1))
+        prob = np.where(both_flush, prob - ((1/cards_left)*(1/(cards_left - 1))), prob)
+
+        total = total + np.where(k < num_pairs, prob, 0.)
+
+    return total
+
+
+def straightflush_gutshot_probs(pairs, num_pairs, suit_flush, flush_draw_outs, cards_left):
+    """Same as straight_gutshot_probs, with both cards of the flush suit"""
+    total = np.zeros(len(pairs))
+
+    for k in range(pairs.shape[1]):
+        num1, num2 = pairs[:, k, 0], pairs[:, k, 1]
+        available = (has_card(flush_draw_outs, card_of(num1, suit_flush))
+                     & has_card(flush_draw_outs, card_of(num2, suit_flush)))
+
+        prob = 2 * (1/cards_left) * (1/(cards_left - 1))
+        total = total + np.where((k < num_pairs) & available, prob, 0.)
+
+    return total
+
+
+def pp_extra_river_probs(board_bits, static_ranks, runouts):
+    """
+    Extra prob of turn + river pairing up (1 pair --> 2 pair, 3oak --> full house)
+
+    Args:
+        board_bits: rank bits of flop + villain's ranks
+        static_ranks: (N, 2) ranks of the other player's hand (fewer cards left of those)
+    """
+    num_ppairs = 13 - count(board_bits)
+    in_board1 = (board_bits >> static_ranks[:, 0]) & 1 == 1
+    in_board2 = (board_bits >> static_ranks[:, 1]) & 1 == 1
+
+    distinct = np.where(~in_board1 & ~in_board2, (num_ppairs*4*3)/runouts,
+                        (((num_ppairs - 1)*4*3)+(1*3*2))/runouts)
+    pocket_pair = np.where(~in_board1, (((num_ppairs - 1)*4*3)+(1*2*1))/runouts, (num_ppairs*4*3)/runouts)
+
+    return np.where(static_ranks[:, 0] != static_ranks[:, 1], distinct, pocket_pair)
+
+
+def pp_extra_river_probs_alt(board_bits, static_ranks, is_flush_draw, flush_draw_outs, straight_draw_outs, runouts):
+    """
+    Same as pp_extra_river_probs, leaving out ranks that are straight outs and
+    turn + river pairs that would make a flush
+    """
+    non_board = all_rank_bits & ~board_bits & ~mask_rank_bits(straight_draw_outs)
+    static_bits = (1 << static_ranks[:, 0]) | (1 << static_ranks[:, 1])
+    flush_draw_ranks = mask_rank_bits(flush_draw_outs)
+
+    # distinct static ranks: ranks_with_4_left, ranks_with_3_left. Pocket pair: ranks_with_4_left, ranks_with_2_left
+    ranks_4 = non_board & ~static_bits
+    ranks_static = non_board & static_bits
+
+    distinct = static_ranks[:, 0] != static_ranks[:, 1]
+
+    a = np.where(is_flush_draw, count(ranks_4 & ~flush_draw_ranks), count(ranks_4))
+    b = np.where(is_flush_draw, count(ranks_4 & flush_draw_ranks) + np.where(distinct, count(ranks_static & ~flush_draw_ranks), 0),
+                 np.where(distinct, count(ranks_static), 0))
+    c = np.where(is_flush_draw, np.where(distinct, count(ranks_static & flush_draw_ranks), count(ranks_static & ~flush_draw_ranks)),
+                 np.where(distinct, 0, count(ranks_static)))
+
+    return ( (a*4*3) + (b*3*2) + (c*2*1) )/runouts
+
+
+def opp_stats_arrays(flop, opp_hands, hands, opp_types, opp_nums, hero_types, hero_nums, dead_cards = ()):
+    """
+    opp_stats for N (opp_hand, hand) rows at once
+
+    Args:
+        flop (tuple(int))
+        opp_hands: (N, 2) int array, the player whose stats these are
+        hands: (N, 2) int array, the other player (hero in opp_stats)
+        opp_types, opp_nums: (N,), (N, 5) hand_strength of opp_hands (see range_engine.hand_strength_array)
+        hero_types, hero_nums: same for hands
+        dead_cards: see opp_stats
+
+    Returns:
+        turn_probs, river_probs: (N, 9) arrays (rows 2-3 of final_res_table)
+        higher_pair_stats: (N, 3) array
+        is_draw_stats: (N, 2) array
+    """
+    n = len(opp_hands)
+    rows = np.arange(n)
+
+    flop_ranks = tuple(card_rank[c] for c in flop)
+    flop_bits = 0
+    for num in flop_ranks:
+        flop_bits |= 1 << num
+
+    opp_ranks = card_rank_arr[opp_hands]
+    opp_suits = card_suit_arr[opp_hands]
+    static_ranks = card_rank_arr[hands]
+
+    hero_pair_rank = hero_nums[:, 0]
+    pair_rank = np.where((opp_types >= 1) & (opp_types <= 3), opp_nums[:, 0], 2)
+
+    with stage('deck'):
+        # deck (cards left per row)
+        seen = (np.uint64(cards_mask(tuple(flop) + tuple(dead_cards))) | card_bits[opp_hands[:, 0]] | card_bits[opp_hands[:, 1]]
+                | card_bits[hands[:, 0]] | card_bits[hands[:, 1]])
+
+        cards_left = 52 - count(seen)
+        runouts = cards_left*(cards_left - 1)
+
+        rank_left = np.zeros((n, 15), dtype = np.int64)
+        for num in all_nums:
+            rank_left[:, num] = 4 - count(seen & rank_masks[num])
+        rank_left[:, 1] = rank_left[:, 14]
+
+        def two_in_a_row(nums):
+            left = rank_left[rows, nums]
+            return left*(left - 1)/runouts
+
+        # flush draw suit (only 1 suit can have 3+ of the 5 cards)
+        suit_counts = np.zeros((n, 4), dtype = np.int64)
+        for c in flop:
+            suit_counts[:, card_suit[c]] += 1
+        for j in range(2):
+            suit_counts[rows, opp_suits[:, j]] += 1
+
+        flush_suit = suit_counts.argmax(axis = 1)
+        max_suit_count = suit_counts.max(axis = 1)
+        has_flush_suit = max_suit_count >= 3
+
+        turn_suit_flush = np.where(max_suit_count == 4, flush_suit, -1)
+        river_suit_flush = np.where(max_suit_count == 3, flush_suit, -1)
+
+    """ Flush """
+    with stage('flush'):
+        flush_draw_outs = np.where(has_flush_suit, suit_masks[flush_suit] & ~seen, np.uint64(0))
+        num_flush_outs = count(flush_draw_outs)
+        cards_needed = np.where(has_flush_suit, 5 - max_suit_count, -1)
+
+        flush_turn = np.where(cards_needed == 1, num_flush_outs/cards_left, 0.)
+        flush_river = np.where(cards_needed == 1, river_probs_of(flush_draw_outs, cards_left),
+                               np.where(cards_needed == 2, (num_flush_outs/cards_left)*((num_flush_outs - 1)/(cards_left - 1)), 0.))
+
+        flush_turn = np.where(opp_types >= 5, 1., flush_turn)
+        flush_river = np.where(opp_types >= 5, 1., flush_river)
+        is_flush_draw = flush_turn > 0
+
+    """ Straight """
+    with stage('straight'):
+        sorted_ranks = np.sort(opp_ranks, axis = 1)
+        outs, pairs, pairs_no_outs, num_pairs, num_pairs_no_outs = gather_tables(
+            sorted_ranks[:, 0] * 15 + sorted_ranks[:, 1], lambda key: straight_draw_table((key // 15, key % 15), flop_ranks))
+
+        non_flush = np.where(turn_suit_flush >= 0, ~suit_masks[np.maximum(turn_suit_flush, 0)], np.uint64(deck_mask))
+        one_card_outs = outs & non_flush & ~seen
+        has_outs = one_card_outs != 0
+
+        pairs, num_pairs = select_pairs(has_outs, pairs, num_pairs, pairs_no_outs, num_pairs_no_outs)
+        gutshot = straight_gutshot_probs(pairs, num_pairs, rank_left, cards_left, turn_suit_flush, river_suit_flush, flush_draw_outs)
+
+        straight_turn = np.where(has_outs, turn_probs_of(one_card_outs, cards_left), 0.)
+        straight_river = np.where(has_outs, (straight_turn + add_to_river_of(one_card_outs, flush_draw_outs, np.uint64(0), cards_left))
+                                  + gutshot, gutshot)
+
+        made_straight = opp_types >= 4
+        straight_turn = np.where(made_straight, 1., straight_turn)
+        straight_river = np.where(made_straight, 1., straight_river)
+        straight_draw_outs = np.where(made_straight, np.uint64(0), one_card_outs)
+
+        is_straight_draw = straight_turn > 0
+
+    """ Higher pair (hero has a pair: villain ends up with a better hand than it) """
+    with stage('higher pair'):
+        opp_key = (opp_nums * place_values).sum(axis = 1)
+        hero_key = (hero_nums * place_values).sum(axis = 1)
+        higher_sorted_nums = (opp_key > hero_key).astype(float)
+
+        higher_pair_outs = np.uint64(0)
+        for j in range(2):
+            num = opp_ranks[:, j]
+            valid = (num > hero_pair_rank) & ((flop_bits >> num) & 1 == 0)
+            higher_pair_outs = higher_pair_outs | np.where(valid, rank_masks[num], np.uint64(0))
+        higher_pair_outs = higher_pair_outs & ~seen & ~flush_draw_outs
+
+        no_pair_turn = turn_probs_of(higher_pair_outs, cards_left)
+        no_pair_river = no_pair_turn + add_to_river_of(higher_pair_outs, flush_draw_outs, straight_draw_outs, cards_left)
+
+        one_pair_higher = np.where(pair_rank > hero_pair_rank, 1., np.where(pair_rank == hero_pair_rank, higher_sorted_nums, 0.))
+
+        higher_pair_now = np.select([opp_types == 1, opp_types > 1], [one_pair_higher, 1.], 0.)
+        higher_pair_turn = np.select([opp_types == 1, opp_types > 1], [one_pair_higher, 1.], no_pair_turn)
+        higher_pair_river = np.select([opp_types == 1, opp_types > 1], [one_pair_higher, 1.], no_pair_river)
+
+        # hero has nothing
+        nothing_higher = np.where(opp_types == 0, higher_sorted_nums, 1.)
+        hero_nothing = hero_types == 0
+        higher_pair_now = np.where(hero_nothing, nothing_higher, higher_pair_now)
+        higher_pair_turn = np.where(hero_nothing, nothing_higher, higher_pair_turn)
+        higher_pair_river = np.where(hero_nothing, nothing_higher, higher_pair_river)
+
+    """ One pair """
+    with stage('one pair'):
+        pair_outs = np.uint64(0)
+        for j in range(2):
+            num = opp_ranks[:, j]
+            pair_outs = pair_outs | np.where((flop_bits >> num) & 1 == 0, rank_masks[num], np.uint64(0))
+        pair_outs = pair_outs & ~seen & ~flush_draw_outs
+
+        pair_turn = turn_probs_of(pair_outs, cards_left)
+        pair_river = pair_turn + add_to_river_of(pair_outs, flush_draw_outs, straight_draw_outs, cards_left)
+
+        pair_turn = np.where(opp_types >= 1, 1., pair_turn)
+        pair_river = np.where(opp_types >= 1, 1., pair_river)
+
+    """ Three of a kind """
+    with stage('three kind'):
+        trips_outs = rank_masks[pair_rank] & ~seen
+        trips_turn = turn_probs_of(trips_outs, cards_left)
+        trips_river = trips_turn + add_to_river_of(trips_outs, flush_draw_outs, straight_draw_outs, cards_left)
+
+        # 0 pair --> 3oak (both of a rank on turn + river), minus flush cards
+        gutshot_trips = 0.
+        for j in range(2):
+            counts = rank_left[rows, opp_ranks[:, j]]
+            counts = counts - (is_flush_draw & has_card(flush_draw_outs, card_of(opp_ranks[:, j], flush_suit)))
+            counts = np.maximum(0, counts)
+            gutshot_trips = gutshot_trips + (counts/cards_left)*((counts - 1)/(cards_left - 1))
+
+        three_kind_turn = np.select([opp_types == 1, opp_types == 2, opp_types >= 3], [trips_turn, 0., 1.], 0.)
+        three_kind_river = np.select([opp_types == 1, opp_types == 2, opp_types >= 3], [trips_river, 0., 1.], gutshot_trips)
+
+    """ Two pair """
+    with stage('two pair'):
+        # second_pair_outs
+        pocket_pair = opp_ranks[:, 0] == opp_ranks[:, 1]
+        missing_rank = np.where(opp_ranks[:, 0] == pair_rank, opp_ranks[:, 1], opp_ranks[:, 0])
+
+        if len(set(flop_ranks)) == 2:
+            other_ranks = rank_cards(opp_ranks[:, 0]) | rank_cards(opp_ranks[:, 1])
+        else:
+            other_ranks = rank_cards(missing_rank)
+            for num in flop_ranks:
+                other_ranks = other_ranks | np.where(num != pair_rank, rank_masks[num], np.uint64(0))
+
+        flop_rank_cards = np.uint64(0)
+        for num in flop_ranks:
+            flop_rank_cards |= rank_masks[num]
+
+        second_pair = np.where(pocket_pair, flop_rank_cards, other_ranks) & ~seen
+        second_pair = np.where(is_flush_draw, second_pair & ~flush_draw_outs, second_pair)
+        second_pair = second_pair & ~straight_draw_outs
+
+        board_bits = (1 << opp_ranks[:, 0]) | (1 << opp_ranks[:, 1]) | flop_bits
+
+        two_pair_turn = turn_probs_of(second_pair, cards_left)
+        two_pair_river = two_pair_turn + add_to_river_of(second_pair, flush_draw_outs, straight_draw_outs, cards_left)
+        two_pair_river = two_pair_river + pp_extra_river_probs_alt(board_bits, static_ranks, is_flush_draw,
+                                                                   flush_draw_outs, straight_draw_outs, runouts)
+
+        # 0 pair --> 2 pair gut shot
+        r1, r2 = rank_left[rows, opp_ranks[:, 0]], rank_left[rows, opp_ranks[:, 1]]
+        f1, f2, f3 = (rank_left[:, num] for num in flop_ranks)
+        term1 = 2*r1*(r2 + f1 + f2 + f3)
+        term2 = 2*r2*(r1 + f1 + f2 + f3)
+        term3 = 2*r1*r2
+        gutshot_two_pair = (term1 + term2 - term3)/runouts
+
+        two_pair_turn = np.select([opp_types == 1, opp_types >= 2], [two_pair_turn, 1.], 0.)
+        two_pair_river = np.select([opp_types == 1, opp_types >= 2], [two_pair_river, 1.], gutshot_two_pair)
+
+    """ Full house """
+    with stage('full house'):
+        # 2 pair
+        boat_outs = (rank_cards(opp_nums[:, 0]) | rank_cards(opp_nums[:, 2])) & ~seen
+        two_pair_boat_turn = turn_probs_of(boat_outs, cards_left)
+        two_pair_boat_river = river_probs_of(boat_outs, cards_left) + two_in_a_row(opp_nums[:, 4])
+
+        # 3oak
+        boat_outs = (rank_cards(opp_nums[:, 3]) | rank_cards(opp_nums[:, 4])) & ~seen
+        trips_boat_turn = turn_probs_of(boat_outs, cards_left)
+        trips_boat_river = river_probs_of(boat_outs, cards_left) + pp_extra_river_probs(board_bits, static_ranks, runouts)
+
+        # 1 pair
+        pair_boat_river = 0.
+        pair_left = rank_left[rows, opp_nums[:, 0]]
+        for j in (2, 3, 4):
+            pair_boat_river = pair_boat_river + 2 * (pair_left * rank_left[rows, opp_nums[:, j]])/runouts
+            pair_boat_river = pair_boat_river + two_in_a_row(opp_nums[:, j])
+
+        fullhouse_turn = np.select([opp_types == 2, opp_types == 3, opp_types >= 6], [two_pair_boat_turn, trips_boat_turn, 1.], 0.)
+        fullhouse_river = np.select([opp_types == 1, opp_types == 2, opp_types == 3, opp_types >= 6],
+                                    [pair_boat_river, two_pair_boat_river, trips_boat_river, 1.], 0.)
+
+    """ Four of a kind """
+    with stage('four kind'):
+        quads_outs = rank_masks[opp_nums[:, 0]] & ~seen
+        trips_quads_turn = turn_probs_of(quads_outs, cards_left)
+        trips_quads_river = river_probs_of(quads_outs, cards_left)
+
+        two_pair_quads_river = 0. + two_in_a_row(opp_nums[:, 0]) + two_in_a_row(opp_nums[:, 2])
+        pair_in_hand = (opp_ranks[:, 0] == opp_nums[:, 0]) | (opp_ranks[:, 1] == opp_nums[:, 0])
+        pair_quads_river = np.where(pair_in_hand, two_in_a_row(opp_nums[:, 0]), 0.)
+
+        four_kind_turn = np.select([opp_types == 3, opp_types >= 7], [trips_quads_turn, 1.], 0.)
+        four_kind_river = np.select([opp_types == 1, opp_types == 2, opp_types == 3, opp_types >= 7],
+                                    [pair_quads_river, two_pair_quads_river, trips_quads_river, 1.], 0.)
+
+    """ Straight flush """
+    with stage('straight flush'):
+        suit = np.where(has_flush_suit, flush_suit, 0)
+        suited_ranks = np.where(opp_suits == suit[:, None], opp_ranks, 0)
+        flop_suited = [tuple(card_rank[c] for c in flop if card_suit[c] == s) for s in all_suits]
+
+        def straight_flush_table(key):
+            s, num1, num2 = key // 225, key // 15 % 15, key % 15
+            return straight_flush_draw_table(tuple(num for num in (num1, num2) if num), flop_suited[s])
+
+        outs, pairs, pairs_no_outs, num_pairs, num_pairs_no_outs = gather_tables(
+            suit * 225 + suited_ranks[:, 0] * 15 + suited_ranks[:, 1], straight_flush_table)
+
+        one_card_sf_outs = outs & suit_masks[suit] & ~seen
+        has_sf_outs = one_card_sf_outs != 0
+
+        pairs, num_pairs = select_pairs(has_sf_outs, pairs, num_pairs, pairs_no_outs, num_pairs_no_outs)
+        sf_gutshot = straightflush_gutshot_probs(pairs, num_pairs, suit, flush_draw_outs, cards_left)
+
+        sf_turn = np.where(has_sf_outs, turn_probs_of(one_card_sf_outs, cards_left), 0.)
+        sf_river = np.where(has_sf_outs, river_probs_of(one_card_sf_outs, cards_left) + sf_gutshot, sf_gutshot)
+
+        sf_turn = np.select([opp_types == 8, ~has_flush_suit], [1., 0.], sf_turn)
+        sf_river = np.select([opp_types == 8, ~has_flush_suit], [1., 0.], sf_river)
+
+        # make sure not to include straight flushes in flush/straight probs
+        flush_turn = np.where(opp_types != 5, flush_turn - sf_turn, flush_turn)
+        flush_river = np.where(opp_types != 5, flush_river - sf_river, flush_river)
+        straight_turn = np.where(opp_types != 4, straight_turn - sf_turn, straight_turn)
+        straight_river = np.where(opp_types != 4, straight_river - sf_river, straight_river)
+
+    """ Only each hand type itself """
+    with stage('adjust'):
+        is_nothing = (opp_types == 0).astype(float)
+
+        turn_probs = np.stack([is_nothing, pair_turn, two_pair_turn, three_kind_turn, straight_turn,
+                               flush_turn, fullhouse_turn, four_kind_turn, sf_turn], axis = 1)
+        river_probs = np.stack([is_nothing, pair_river, two_pair_river, three_kind_river, straight_river,
+                                flush_river, fullhouse_river, four_kind_river, sf_river], axis = 1)
+
+        for probs in (turn_probs, river_probs):
+            better = 0.
+            for hand_type in range(1, 9):
+                better = better + np.where(hand_type > opp_types, probs[:, hand_type], 0.)
+
+            probs[rows, opp_types] = probs[rows, opp_types] - better
+            probs[np.arange(9)[None] < opp_types[:, None]] = 0
+
+        # add hand types > hero's current hand type
+        hero_pair = hero_types == 1
+        turn_better, river_better = 0., 0.
+        for hand_type in range(1, 9):
+            counted = (hand_type >= 2) | hero_nothing
+            turn_better = turn_better + np.where(counted, turn_probs[:, hand_type], 0.)
+            river_better = river_better + np.where(counted, river_probs[:, hand_type], 0.)
+
+        higher_pair_turn = np.minimum(1, higher_pair_turn + turn_better)
+        higher_pair_river = np.minimum(1, higher_pair_river + river_better)
+
+        higher_pair_stats = np.stack([higher_pair_now, higher_pair_turn, higher_pair_river], axis = 1)
+        higher_pair_stats[~hero_pair & ~hero_nothing] = -1
+
+        is_draw_stats = np.stack([is_straight_draw, is_flush_draw], axis = 1).astype(float)
+
+    return turn_probs, river_probs, higher_pair_stats, is_draw_stats
+
+
+def opp_stats(flop, hand, opp_hand, dead_cards = ()):
+    """
+    Returns the probabilities that opponent achieves each hand type on flop/turn/river
+    given inputted flop and hero's hands (1 row of opp_stats_arrays)
+
+    Args:
+        flop (tuple(int)): The 3 cards on flop. E.g. parse_cards('Kc7cTs')
+        hand (tuple(int)): The 2 cards in your hand: E.g. parse_cards('Kd3c')
+        opp_hand (tuple(int)): The 2 cards in opponent's hand: E.g. parse_cards('7d6c')
+        dead_cards (tuple(int)): cards out of the deck (e.g. folded), removed from every outs
+
+    Returns:
+        final_res_table (np.array): 2d ndarray of opponent's probabilities of each hand type on flop/turn/river
+        higher_pair_stats (np.array): 1d ndarray of opponent's chance of improving past hero's current hand
+        is_draw_stats (np.array): 1x2 array of 0/1 representing if opp has straight/flush draw
+    """
+    # Example: (1, [5, 5, 11, 4, 3]) custom sorted already
+    opp_type, opp_nums = hand_strength(opp_hand, flop)
+    hero_type, hero_nums = hand_strength(hand, flop)
+
+    turn_probs, river_probs, higher_pair_stats, is_draw_stats = opp_stats_arrays(
+        flop, np.array([opp_hand]), np.array([hand]), np.array([opp_type]), np.array([opp_nums]),
+        np.array([hero_type]), np.array([hero_nums]), dead_cards)
+
+    curr_probs = np.zeros(9)
+    curr_probs[opp_type] = 1
+
+    final_res_table = np.array([curr_probs, turn_probs[0], river_probs[0]])
+
+    assert np.isclose(sum(final_res_table[1]), 1, rtol = 1e-10), "opp_stat: row 2 doesn't add up"
+    assert np.isclose(sum(final_res_table[2]), 1, rtol = 1e-10), "opp_stat: row 3 doesn't add up"
+
+    return final_res_table, higher_pair_stats[0], is_draw_stats[0]
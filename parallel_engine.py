@@ -0,0 +1,134 @@
+'''
+Process-pool evaluation of large ranges
+
+The filtered range is split into chunks, each worker returns partial sums
+(sum of its combos' tensors), and the parent adds them up and divides by the
+range size. Pools are kept alive between calls (one per worker count), so
+workers keep their imports, hand_rank_table and draw tables warm.
+
+The outs math is vectorized over each chunk (see outs_engine.py), with a fixed
+cost per call, so chunks are kept large. Below parallel_threshold combos, pool
+overhead is more than the work, so the range is evaluated in the calling
+process instead.
+
+Callers can pass a progress callback (called after each chunk), e.g. for the
+GUI's progress bar; raising from it cancels the rest of the calculation.
+'''
+
+from range_engine import *
+import atexit
+import os
+
+parallel_threshold = 1024
+chunks_per_worker = 4
+min_chunk_size = 256
+progress_chunk_size = 256
+
+worker_pools = {}
+
+
+def get_pool(workers = None):
+    """
+    Returns:
+        ProcessPoolExecutor: warm pool with this many workers (created on first use)
+    """
+    # imported here: multiprocessing is slow to import and serial callers never need it
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count()
+
+    if workers not in worker_pools:
+        worker_pools[workers] = ProcessPoolExecutor(max_workers = workers)
+
+    return worker_pools[workers]
+
+
+def shutdown_pools():
+    for pool in worker_pools.values():
+        pool.shutdown(cancel_futures = True)
+    worker_pools.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+def range_tensors(combos, flop, hand, pov):
+    """
+    pov (str): 'opp'/'hero' (see range_prob_tensor) or 'both' (see range_both_tensors)
+    """
+    if pov == 'both':
+        return range_both_tensors(combos, flop, hand)
+
+    return range_prob_tensor(combos, flop, hand, pov)
+
+
+def chunk_sums(combos, flop, hand, pov):
+    """
+    Worker task: partial sums over a chunk of the range
+
+    Returns:
+        tuple of arrays (see range_tensors), each summed over the chunk's combos
+    """
+    return tuple(t.sum(axis = 0) for t in range_tensors(combos, flop, hand, pov))
+
+
+def split_range(combos, num_workers):
+    """Splits range into chunks (a few per worker, so slow chunks even out)"""
+    num_chunks = max(1, min(num_workers * chunks_per_worker, len(combos) // min_chunk_size))
+
+    return np.array_split(combos, num_chunks)
+
+
+def range_means(combos, flop, hand, pov, executor = None, workers = None, progress = None):
+    """
+    Mean of range_prob_tensor (pov = 'opp'/'hero') or range_both_tensors (pov = 'both')
+    over an already filtered, non-empty range
+
+    Args:
+        combos: (N, 2) int array
+        flop (tuple(int)), hand (tuple(int))
+        pov (str): 'opp', 'hero' or 'both'
+        executor (concurrent.futures.Executor): pool to run chunks on
+        workers (int): use the warm pool with this many workers (if no executor)
+        progress (callable): progress(done, total) called after each chunk.
+                             Raising an exception from it stops the calculation
+
+    Returns:
+        tuple of arrays, each the mean over the range's combos
+    """
+    n = len(combos)
+    parallel = (executor is not None or (workers is not None and workers > 1)) and n >= parallel_threshold
+
+    if not parallel and progress is None:
+        return tuple(t.mean(axis = 0) for t in range_tensors(combos, flop, hand, pov))
+
+    if parallel:
+        if executor is None:
+            executor = get_pool(workers)
+        num_workers = getattr(executor, '_max_workers', None) or workers or os.cpu_count()
+
+        chunks = split_range(combos, num_workers)
+        futures = [executor.submit(chunk_sums, chunk, flop, hand, pov) for chunk in chunks]
+        results = (future.result() for future in futures)
+    else:
+        # serial, but in chunks so progress can be reported
+        futures = []
+        chunks = np.array_split(combos, max(1, n // progress_chunk_size))
+        results = (chunk_sums(chunk, flop, hand, pov) for chunk in chunks)
+
+    # reduce partial sums in the parent
+    totals = None
+    done = 0
+    try:
+        for chunk, sums in zip(chunks, results):
+            totals = sums if totals is None else tuple(a + b for a, b in zip(totals, sums))
+            done += len(chunk)
+
+            if progress is not None:
+                progress(done, n)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+    return tuple(t / n for t in totals)
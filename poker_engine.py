@@ -0,0 +1,29 @@
+'''
+Headless entry point to the probability engine
+
+Everything a script/batch worker needs, without Tk (main.py is the GUI) and
+without importing pokerkit (only loaded if a function needs it, e.g.
+Range.from_str or parse_range). Import cost is checked by benchmark.py
+against import_budget_ms.
+
+    from poker_engine import main_function, Range
+
+    r = Range.from_str('QQ+,AKs')
+    hero_hand_type, result_opp, result_hero, opp_improve_probs, opp_draw_probs = main_function(r, 'QdTd5c', 'AdQc')
+'''
+
+from cards import parse_cards, cards_to_str, card_str, full_deck
+from hand_strength import hand_strength, hand_type_dict
+from evaluator import score_hands, score_hand, hand_type_of
+from combo_range import Range, hand_class_mask, combo_cards, combo_index
+from outs_engine import opp_stats
+from range_engine import range_to_array
+from result_store import ResultStore
+from incremental_engine import IncrementalRange
+from flop_db import FlopDatabase
+from prob_functions import (main_function, range_equity, range_vs_hand_prob_matrix, range_vs_hand_both,
+                            range_vs_hand_runouts, range_vs_hand_sampled, range_vs_range, filter_range)
+from validity_check import is_valid_hand, is_valid_flop
+from atom_funcs import parse_range
+
+import_budget_ms = 300
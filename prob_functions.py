@@ -1,87 +1,73 @@
 from draw_stats_prototype import *
+from range_engine import *
+from parallel_engine import range_means
+from runout_engine import *
+from sampling_engine import sample_runouts
+from matrix_engine import matrix_counts, runouts_per_pair
+from result_store import ResultStore, spot_key
+from profiling import stage
 
 def frozenset_to_str(two_cards):
     """
     Turns frozenset object representing 2 cards to str format
     E.g. frozenset({Ad, As}) --> 'Ad,As'
-    """
 
-    card1, card2 = two_cards
+    (GUI/debugging only...engine uses range_to_array)
+    """
 
-    s1 = str(card1)[-3:-1]
-    s2 = str(card2)[-3:-1]
+    c1, c2 = combo_to_cards(two_cards)
 
-    return s1, s2
+    return card_str[c1], card_str[c2]
     
 
 def remove_cards_from_range(r, *cards):
     """
-    For any set of cards (e.g. 'Ah', 'Td'), remove all hands in range r
+    For any set of cards (e.g. parse_cards('AhTd')), remove all hands in range r
     that contain any of those cards
     
     Args:
-        cards: List[str] of cards
+        r: (N, 2) int array of hands (see range_to_array)
+        cards: ints of cards
 
     Returns:
-        set(frozenset({'Ac', 'Td'}), frozenset({'Ac', 'Td'})...)
+        (M, 2) int array of remaining hands
     """
-    cards_to_remove = set(cards)
-    to_remove = set()
-    
-    for hand in r:
-        # remove if either card1 or card2 of hand is in cards_to_remove
-        x, y = frozenset_to_str(hand)
-        if (x in cards_to_remove) or (y in cards_to_remove):
-            to_remove.add(hand)
-    
-    r_filtered = r.difference(to_remove)
+    # remove if either card1 or card2 of hand is in cards
+    r_filtered = r[~blocked_mask(r, *cards)]
     return r_filtered
 
 
-def filter_range(r, flop_str, hand_str):
-    board = hand_str + flop_str
-    cards_out = get_cards_str(board)
+def filter_range(r, flop, hand):
+    board = hand + flop
 
-    r_filtered = remove_cards_from_range(r, *cards_out)
+    r_filtered = remove_cards_from_range(r, *board)
 
     return r_filtered
 
 
-def range_vs_hand_prob_matrix(r, flop_str, hand_str, pov):
+def range_vs_hand_prob_matrix(r, flop, hand, pov, executor = None, workers = None, progress = None):
     """
+    Args:
+        r: (N, 2) int array of opp's range (see range_to_array)
+        flop (tuple(int)): e.g. parse_cards('QdTd5c')
+        hand (tuple(int)): e.g. parse_cards('AdQc')
+        executor, workers: run on a process pool (see parallel_engine.range_means)
+        progress (callable): progress(done, total) after each chunk of the range
+
     Returns:
         avg_higher_pair_opp: If hero has pair, probability of villain 
         having a better hand (flop, turn, river) 
     
     """
     # filter impossible hands out of opp's range
-    r_filtered = filter_range(r, flop_str, hand_str)
+    r_filtered = filter_range(r, flop, hand)
 
     if len(r_filtered) == 0:
         return -1, -1, -1
 
-    # calculate probabilities
-    matrix = np.zeros((3,9))
-    avg_higher_pair_probs = np.zeros(3)
-    avg_is_draw_stats = np.zeros(2)
-
-    for hand in r_filtered:
-        s1, s2 = frozenset_to_str(hand)
-        curr_opp_hand_str = s1 + s2
-        
-        # can switch args to get stats for other person (3rd arg is the prob)
-        if pov == 'opp':
-            curr_matrix, curr_higher_pair_stats, curr_is_draw_stats = opp_stats(flop_str, hand_str, curr_opp_hand_str)
-        elif pov == 'hero':
-            curr_matrix, curr_higher_pair_stats, curr_is_draw_stats = opp_stats(flop_str, curr_opp_hand_str, hand_str)
-        
-        matrix += curr_matrix
-        avg_higher_pair_probs += curr_higher_pair_stats
-        avg_is_draw_stats += curr_is_draw_stats
-
-    matrix = matrix / len(r_filtered)
-    avg_higher_pair_probs = avg_higher_pair_probs / len(r_filtered)
-    avg_is_draw_stats = avg_is_draw_stats / len(r_filtered)
+    # calculate probabilities (one row per combo), averaged over range
+    matrix, avg_higher_pair_probs, avg_is_draw_stats = range_means(r_filtered, flop, hand, pov, executor, workers,
+                                                                      progress)
 
     assert np.isclose(np.sum(matrix[0]), 1, rtol = 1e-10), "Prob row 1 doesn't add up"
     assert np.isclose(np.sum(matrix[1]), 1, rtol = 1e-10), "Prob row 2 doesn't add up"
@@ -90,15 +76,170 @@ def range_vs_hand_prob_matrix(r, flop_str, hand_str, pov):
     return matrix, avg_higher_pair_probs, avg_is_draw_stats
 
 
-def main_function(r, flop_str, hand_str):
+def range_vs_hand_both(r, flop, hand, executor = None, workers = None, progress = None):
+    """
+    range_vs_hand_prob_matrix for both pov's with one filter + one pass over the range
+    (executor, workers, progress: see range_vs_hand_prob_matrix)
+
+    Returns:
+        result_opp, result_hero (np.array): 3x9 hand type probs on flop/turn/river
+        avg_higher_pair_opp (np.array): see range_vs_hand_prob_matrix
+        avg_is_draw_opp (np.array): prob villain has straight/flush draw
+    """
+    r_filtered = filter_range(r, flop, hand)
+
+    if len(r_filtered) == 0:
+        return -1, -1, -1, -1
+
+    result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp = range_means(r_filtered, flop, hand, 'both',
+                                                                                executor, workers, progress)
+
+    assert np.allclose(result_opp.sum(axis = 1), 1, rtol = 1e-10), "Opp prob rows don't add up"
+    assert np.allclose(result_hero.sum(axis = 1), 1, rtol = 1e-10), "Hero prob rows don't add up"
+
+    return result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp
+
+
+def range_vs_hand_runouts(r, flop, hand):
+    """
+    Exact version of range_vs_hand_prob_matrix (both pov's at once):
+    enumerates every turn/river for every combo (see runout_engine.py).
+    flop can also be a turn board (4 cards), then only the river is enumerated
+    and every result has 2 streets (turn, river) instead of 3, or a river
+    board (5 cards, 1 street)
+
+    Returns:
+        result_opp, result_hero (np.array): 3x9 hand type probs on flop/turn/river
+        avg_higher_pair_opp (np.array): prob villain surpasses hero's current hand
+        avg_is_draw_opp (np.array): prob villain has straight/flush draw
+        avg_equity (np.array): 3x3 villain's [win, tie, lose] vs hero on flop/turn/river
+    """
+    r_filtered = filter_range(r, flop, hand)
+
+    if len(r_filtered) == 0:
+        return -1, -1, -1, -1, -1
+
+    tensors = {3: runout_tensors, 4: river_tensors, 5: showdown_tensors}[len(flop)]
+    opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats, equity = tensors(r_filtered, flop, hand)
+
+    return (opp_tensor.mean(axis = 0), hero_tensor.mean(axis = 0), higher_pair_stats.mean(axis = 0),
+            is_draw_stats.mean(axis = 0), equity.mean(axis = 0))
+
+
+def range_vs_hand_sampled(r, flop, hand, **options):
+    """
+    Monte Carlo version of range_vs_hand_runouts: samples turn/river runouts
+    until the estimates are within a target error (see sampling_engine.py)
+
+    Args:
+        options: passed to sample_runouts (target_error, confidence, seed, max_samples, progress)
+
+    Returns:
+        same as range_vs_hand_runouts, plus
+        report (dict): samples, achieved error, converged... (see sample_runouts)
+    """
+    r_filtered = filter_range(r, flop, hand)
+
+    if len(r_filtered) == 0:
+        return -1, -1, -1, -1, -1, -1
+
+    return sample_runouts(r_filtered, flop, hand, **options)
+
+
+def range_equity(r, flop_str, hand_str):
+    """
+    True equity of villain's range vs hero (exact runout enumeration)
+
+    Args:
+        see main_function
+
+    Returns:
+        np.array: 3x3 villain's [win, tie, lose] prob on flop/turn/river (-1 if range is empty)
+                  (one row per street, see range_vs_hand_runouts)
+    """
+    flop = parse_cards(flop_str)
+    hand = parse_cards(hand_str)
+
+    return range_vs_hand_runouts(range_to_array(r), flop, hand)[-1]
+
+
+def range_vs_range(hero_r, villain_r, flop_str, executor = None, workers = None):
+    """
+    Hero's range vs villain's range: exact equity of every hero combo vs every
+    villain combo (see matrix_engine.py)
+
+    Args:
+        hero_r, villain_r: ranges (Range, or set of frozenset)
+        flop_str (str): e.g. 'QdTd5c'
+        executor (Executor), workers (int): split the matrix across a process pool
+
+    Returns:
+        hero_combos (np.array): (Nh, 2) hero's combos left after removing flop cards (matrix rows)
+        villain_combos (np.array): (Nv, 2) villain's combos (matrix columns)
+        equity_matrix (np.array): (Nh, Nv) hero's equity (win + tie / 2) vs each villain combo,
+                                  nan if the 2 combos share a card
+        hero_equity (np.array): (Nh,) each hero combo's equity vs villain's range
+        villain_equity (np.array): (Nv,) each villain combo's equity vs hero's range
+        total_equity (float): hero's range's equity vs villain's range
+        (all -1 if a range is empty after filtering)
+    """
+    flop = parse_cards(flop_str)
+
+    hero_combos = remove_cards_from_range(range_to_array(hero_r), *flop)
+    villain_combos = remove_cards_from_range(range_to_array(villain_r), *flop)
+
+    if len(hero_combos) == 0 or len(villain_combos) == 0:
+        return -1, -1, -1, -1, -1, -1
+
+    wins, ties, valid = matrix_counts(hero_combos, villain_combos, flop, executor, workers)
+
+    equity = np.where(valid, (wins + ties / 2) / runouts_per_pair, 0)
+    equity_matrix = np.where(valid, equity, np.nan)
+
+    # every non-blocked pair counts the same (nan if a combo is blocked by the whole other range)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        hero_equity = equity.sum(axis = 1) / valid.sum(axis = 1)
+        villain_equity = 1 - equity.sum(axis = 0) / valid.sum(axis = 0)
+        total_equity = float(equity.sum() / valid.sum())
+
+    return hero_combos, villain_combos, equity_matrix, hero_equity, villain_equity, total_equity
+
+
+def improve_probs(hero_hand_type, result_opp, avg_higher_pair_opp):
+    """
+    Prob villain ends up ahead of hero's current hand, per street
+    (sum of villain's hand types above hero's, or avg_higher_pair_opp if hero has a pair or nothing)
+    """
+    if (hero_hand_type == 0) or (hero_hand_type == 1):
+        return avg_higher_pair_opp
+
+    return np.sum(result_opp[:, hero_hand_type + 1:], axis = 1)
+
+
+def main_function(r, flop_str, hand_str, method = 'outs', store = None, executor = None, workers = None,
+                  progress = None, sampling = None, report = None):
     """
     The main function that calculates hand vs. range odds 
     (the primary function of the GUI)
 
     Args:
         r (set(frozenset)): The set (range) of hands that opponent might have
-        flop_str (str): The cards in flop (e.g. 'QdTd5c')
+        flop_str (str): The cards in flop (e.g. 'QdTd5c'), or flop + turn (e.g. 'QdTd5c2s')
+                        for turn --> river stats (rows are then turn/river, not flop/turn/river),
+                        or all 5 board cards (1 row: river)
         hand_str (str): Hero's cards  (e.g. 'AdQc')
+        method (str): 'outs' for the closed-form outs math (opp_stats), 
+                      'exact' to enumerate every turn/river (runout_engine.py),
+                      'sample' to estimate from random runouts (sampling_engine.py).
+                      Turn/river boards are never 'outs' (exact unless sampled: 1 card or none to come)
+        store (ResultStore): optional disk cache of results (see result_store.py)
+        executor (Executor), workers (int): evaluate big ranges on a process pool 
+                                            ('outs' only, see parallel_engine.py)
+        progress (callable): progress(done, total) as the range is evaluated ('outs'/'sample').
+                             Raising from it cancels the calculation
+        sampling (dict): options for sample_runouts (method = 'sample'), e.g. {'target_error': 0.002, 'seed': 1}
+        report (dict): filled in with the sampler's report (samples, error, converged...) for method = 'sample'.
+                       Sampled results aren't cached in store
 
     Returns:
         hero_hand_type (int): What hand hero currently has (e.g. 1 = pair...9 = straight flush)
@@ -108,24 +249,58 @@ def main_function(r, flop_str, hand_str):
         avg_is_draw_opp (np.array): 1d ndarray of opp's chance of having straight/flush draw
     """
     
+    # strings/pokerkit objects stop here: engine runs on ints (see cards.py)
+    with stage('parse'):
+        flop = parse_cards(flop_str)
+        hand = parse_cards(hand_str)
+        r = range_to_array(r)
+
+    if method == 'sample':
+        store = None
+
+    if store is not None:
+        key = spot_key(r, flop, hand, method)
+        result = store.get(key)
+        if result is not None:
+            return result
+
     # get hero's current hand type
-    hero_hand_type = hand_strength(hand_str, flop_str)[0]
+    hero_hand_type = hand_strength(hand, flop)[0]
 
-    # villain's probabilities
-    result_opp, avg_higher_pair_opp, avg_is_draw_opp = range_vs_hand_prob_matrix(r, flop_str, hand_str, pov = 'opp')
-    
-    if type(result_opp) == int:
-        return -1, -1, -1, -1, -1
+    if method == 'sample':
+        result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp, _, sample_report = range_vs_hand_sampled(
+            r, flop, hand, progress = progress, **(sampling or {}))
 
-    # hero's probabilities
-    result_hero = range_vs_hand_prob_matrix(r, flop_str, hand_str, pov = 'hero')[0]
+        if type(result_opp) == int:
+            return -1, -1, -1, -1, -1
 
-    # sum up probs of events better than your current hand
-    opp_improve_probs = np.sum(result_opp[:, hero_hand_type + 1:], axis = 1)
-    if (hero_hand_type == 0) or (hero_hand_type == 1):
-        opp_improve_probs = avg_higher_pair_opp
+        if report is not None:
+            report.update(sample_report)
+
+    elif method == 'exact' or len(flop) > 3:
+        result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp, _ = range_vs_hand_runouts(r, flop, hand)
+
+        if type(result_opp) == int:
+            return -1, -1, -1, -1, -1
+
+    else:
+        # villain's and hero's probabilities (one pass)
+        result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp = range_vs_hand_both(r, flop, hand, executor, workers,
+                                                                                                  progress)
+        
+        if type(result_opp) == int:
+            return -1, -1, -1, -1, -1
+
+    with stage('reduction'):
+        # sum up probs of events better than your current hand
+        opp_improve_probs = improve_probs(hero_hand_type, result_opp, avg_higher_pair_opp)
+
+        result = hero_hand_type, result_opp, result_hero, opp_improve_probs, avg_is_draw_opp
+
+    if store is not None:
+        store.put(key, result)
 
-    return hero_hand_type, result_opp, result_hero, opp_improve_probs, avg_is_draw_opp
+    return result
 
 
 
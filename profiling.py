@@ -0,0 +1,265 @@
+'''
+Opt-in per-stage profiling of main_function / opp_stats
+
+    from profiling import profile
+
+    with profile() as stats:
+        main_function(r, 'QdTd5c', 'AdQc')
+
+    print(stats.report())                     # cumulative time + calls per stage
+    stats.dump_collapsed('spot.folded')       # flamegraph.pl spot.folded > spot.svg
+
+Stages nest, so every timing is recorded under its stack of stages, e.g.
+"main_function;villain pass;opp_stats":
+
+- main_function phases: parse (cards/range to ints), filter (filter_range),
+  villain pass, hero pass, reduction. With method = 'outs' each pass is one
+  vectorized opp_stats over the range (see outs_engine.py). The exact and
+  sampled paths score both sides at once (runouts stage)
+- opp_stats stages (outs_engine.opp_stats_arrays, also under a single
+  combo's opp_stats): deck, flush, straight, higher pair, one pair,
+  three kind, two pair, full house, four kind, straight flush, adjust
+
+While profile() is on, the functions in stage_hooks are swapped for timing
+wrappers in the engine modules that import them (patched_modules, plus the
+__main__ script), and put back afterwards. With no profile running nothing is
+wrapped, and the stage() blocks in the engine are a None check.
+
+Only the thread that entered profile() is timed: other threads (e.g. the GUI's
+precompute worker) go through the wrappers without recording anything, and
+ranges split across a process pool (workers > 1) only show up as their pass
+stages.
+'''
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import sys
+import threading
+import time
+
+# function name --> stage name (None: same as function name)
+stage_hooks = {
+    'main_function': None,
+    'filter_range': 'filter',
+    'opp_stats_arrays': 'opp_stats',
+    'runout_tensors': 'runouts',
+    'river_tensors': 'runouts',
+    'showdown_tensors': 'runouts',
+    'sample_runouts': 'runouts',
+    'hand_strength': None,
+    'hand_strength_array': None,
+}
+
+# modules the hooked functions are defined in (imported when profiling starts)
+hooked_modules = ['prob_functions', 'range_engine', 'outs_engine', 'runout_engine', 'sampling_engine', 'hand_strength']
+
+# modules whose references to the hooked functions are swapped (if imported)
+patched_modules = hooked_modules + ['parallel_engine', 'incremental_engine', 'matrix_engine', 'poker_engine',
+                                    'batch', 'server', '__main__']
+
+active = None
+no_stage = nullcontext()
+
+
+class StageStats:
+    """
+    Cumulative wall time and call counts per stack of stages
+
+    Attributes:
+        stacks (dict): (stage, ..., stage) --> [calls, seconds] (seconds include nested stages)
+    """
+
+    def __init__(self):
+        self.stacks = {}
+        # only this thread records (see recording)
+        self.thread = threading.get_ident()
+        self.local = threading.local()
+
+    @property
+    def stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def enter(self, name):
+        self.stack.append(name)
+        return time.perf_counter()
+
+    def exit(self, start):
+        seconds = time.perf_counter() - start
+        key = tuple(self.stack)
+        self.stack.pop()
+
+        entry = self.stacks.get(key)
+        if entry is None:
+            self.stacks[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit(start)
+
+    def stages(self):
+        """
+        Totals per stage name, over every stack it appears in
+        (nested calls of the same stage aren't counted twice)
+
+        Returns:
+            dict: stage --> {'calls': int, 'seconds': float}, slowest first
+        """
+        res = {}
+        for key, (calls, seconds) in self.stacks.items():
+            name = key[-1]
+            if name in key[:-1]:
+                continue
+            entry = res.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += calls
+            entry['seconds'] += seconds
+
+        return dict(sorted(res.items(), key = lambda item: -item[1]['seconds']))
+
+    def self_seconds(self):
+        """(stage, ..., stage) --> seconds spent in that stage itself (minus nested stages)"""
+        res = {key: seconds for key, (calls, seconds) in self.stacks.items()}
+        for key, (calls, seconds) in self.stacks.items():
+            if len(key) > 1 and key[:-1] in res:
+                res[key[:-1]] -= seconds
+
+        return res
+
+    def collapsed(self):
+        """
+        Flamegraph collapsed stack lines ("a;b;c <microseconds>"), self time per stack
+
+        Returns:
+            List[str]
+        """
+        return [f"{';'.join(key)} {max(0, round(seconds * 1e6))}" for key, seconds in sorted(self.self_seconds().items())]
+
+    def dump_collapsed(self, f):
+        """
+        Args:
+            f: path or text file object
+        """
+        if isinstance(f, str):
+            with open(f, 'w') as fout:
+                return self.dump_collapsed(fout)
+
+        for line in self.collapsed():
+            f.write(line + '\n')
+
+    def as_dict(self):
+        """JSON-friendly: {'stages': see stages(), 'stacks': {'a;b;c': {'calls', 'seconds'}}}"""
+        return {'stages': self.stages(),
+                'stacks': {';'.join(key): {'calls': calls, 'seconds': seconds} for key, (calls, seconds) in self.stacks.items()}}
+
+    def report(self):
+        """Table of stages(), one line per stage"""
+        lines = [f"{'stage':<26}{'calls':>10}{'total ms':>12}{'us/call':>10}"]
+        for name, entry in self.stages().items():
+            lines.append(f"{name:<26}{entry['calls']:>10}{entry['seconds'] * 1e3:>12.2f}"
+                         f"{entry['seconds'] * 1e6 / entry['calls']:>10.1f}")
+
+        return '\n'.join(lines)
+
+
+def recording():
+    """
+    Returns:
+        StageStats: the running profile, if called from the thread that started it (else None)
+    """
+    stats = active
+    if stats is None or stats.thread != threading.get_ident():
+        return None
+    return stats
+
+
+def stage(name):
+    """Context manager timing a stage if this thread is being profiled (else does nothing)"""
+    stats = recording()
+    if stats is None:
+        return no_stage
+    return stats.stage(name)
+
+
+""" --- Hooks --- """
+
+def timed(func, name):
+    """Wrapper recording func's calls under stage name"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        stats = recording()
+        if stats is None:
+            return func(*args, **kwargs)
+
+        start = stats.enter(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.exit(start)
+
+    return wrapper
+
+
+def install_hooks():
+    """
+    Swaps every hooked function for its wrapper, in the patched_modules that have it
+
+    Returns:
+        list of (module, name, original function) to put back
+    """
+    for module_name in hooked_modules:
+        __import__(module_name)
+
+    originals = {}
+    for module_name in hooked_modules:
+        module = sys.modules[module_name]
+        for func_name in stage_hooks:
+            func = module.__dict__.get(func_name)
+            if func is not None and getattr(func, '__module__', None) == module_name:
+                originals[func_name] = func
+
+    wrappers = {func_name: timed(func, stage_hooks[func_name] or func_name) for func_name, func in originals.items()}
+
+    patched = []
+    for module_name in patched_modules:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        namespace = module.__dict__
+        for func_name, func in originals.items():
+            if namespace.get(func_name) is func:
+                namespace[func_name] = wrappers[func_name]
+                patched.append((namespace, func_name, func))
+
+    return patched
+
+
+@contextmanager
+def profile():
+    """
+    Times every stage while the with block runs (not re-entrant)
+
+    Yields:
+        StageStats: filled in as the block runs
+    """
+    global active
+
+    if active is not None:
+        raise RuntimeError('A profile is already running')
+
+    stats = StageStats()
+    patched = install_hooks()
+    active = stats
+    try:
+        yield stats
+    finally:
+        active = None
+        for namespace, func_name, func in patched:
+            namespace[func_name] = func
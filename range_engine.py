@@ -0,0 +1,190 @@
+'''
+Batched (numpy) range engine
+
+A range is an (N, 2) int array of cards (see cards.py). Instead of calling
+opp_stats once per combo (3 small arrays each time), range_prob_tensor fills
+one (N, 3, 9) tensor for the whole range:
+
+- filtering out combos that hit the board/hand: one np.isin
+- hand type + custom-sorted ranks of every combo (flop row): array ops
+- turn/river rows: the outs math for every combo at once, as array ops over
+  the combo axis (see outs_engine.py)
+
+Averaging over the range is then one reduction (tensor.mean(axis = 0)).
+range_both_tensors does villain's and hero's tensors, sharing hand strengths.
+'''
+
+from outs_engine import *
+from combo_range import Range
+from profiling import stage
+import numpy as np
+
+low_straight = np.array([14, 5, 4, 3, 2])
+
+
+def range_to_array(r):
+    """
+    Turns range (Range, or set of frozenset of pokerkit Cards) into (N, 2) int array
+    """
+    if isinstance(r, Range):
+        return r.combos()
+
+    if len(r) == 0:
+        return np.zeros((0, 2), dtype = np.int64)
+
+    return np.array([combo_to_cards(hand) for hand in r], dtype = np.int64)
+
+
+def blocked_mask(combos, *cards):
+    """
+    Returns:
+        (N,) bool array: True if combo contains any of cards
+    """
+    return np.isin(combos, cards).any(axis = 1)
+
+
+def hand_strength_array(boards):
+    """
+    Vectorized hand_strength for many 5-card boards at once
+
+    Args:
+        boards: (N, 5) int array of cards (hand + flop)
+
+    Returns:
+        hand_types: (N,) int array (same numbers as hand_type_dict)
+        nums: (N, 5) int array of ranks custom-sorted (by freq, then magnitude)
+    """
+    n = len(boards)
+    nums = card_rank_arr[boards]
+    suits = card_suit_arr[boards]
+
+    rank_freq = np.zeros((n, 15), dtype = np.int64)
+    suit_freq = np.zeros((n, 4), dtype = np.int64)
+    rows = np.arange(n)[:, None]
+    np.add.at(rank_freq, (rows, nums), 1)
+    np.add.at(suit_freq, (rows, suits), 1)
+
+    # custom_sort: sort by freq first, then magnitude (both descending)
+    card_freq = np.take_along_axis(rank_freq, nums, axis = 1)
+    sort_key = np.sort(card_freq * 16 + nums, axis = 1)[:, ::-1]
+    nums = sort_key % 16
+
+    max_freq = rank_freq.max(axis = 1)
+    num_pairs = (rank_freq == 2).sum(axis = 1)
+
+    is_flush = suit_freq.max(axis = 1) == 5
+    is_straight = (np.all(nums[:, :-1] - nums[:, 1:] == 1, axis = 1)
+                   | np.all(nums == low_straight, axis = 1))
+
+    # same order of checks as hand_strength
+    hand_types = np.zeros(n, dtype = np.int64)
+    hand_types[num_pairs == 1] = 1
+    hand_types[num_pairs == 2] = 2
+    hand_types[max_freq == 3] = 3
+    hand_types[(max_freq == 3) & (num_pairs == 1)] = 6
+    hand_types[max_freq == 4] = 7
+    hand_types[is_flush] = 5
+    hand_types[is_straight] = 4
+    hand_types[is_straight & is_flush] = 8
+
+    return hand_types, nums
+
+
+def both_strength_arrays(combos, flop, hand):
+    """
+    hand_strength of every combo, and hero's (repeated per combo)
+
+    Returns:
+        (combo_types, combo_nums), (hero_types, hero_nums): (N,), (N, 5) int arrays
+    """
+    n = len(combos)
+    boards = np.hstack([combos, np.broadcast_to(np.array(flop), (n, 3))])
+    hero_type, hero_nums = hand_strength(hand, flop)
+
+    return hand_strength_array(boards), (np.full(n, hero_type), np.broadcast_to(np.array(hero_nums), (n, 5)))
+
+
+def range_prob_tensor(combos, flop, hand, pov = 'opp'):
+    """
+    Per-combo opp_stats for a whole (already filtered) range
+
+    Args:
+        combos: (N, 2) int array of opp's hands
+        flop (tuple(int)): e.g. parse_cards('QdTd5c')
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+        pov (str): 'opp' for villain's stats, 'hero' for hero's stats (vs each combo)
+
+    Returns:
+        prob_tensor: (N, 3, 9) array, [i] = final_res_table of combo i
+        higher_pair_stats: (N, 3) array
+        is_draw_stats: (N, 2) array
+    """
+    n = len(combos)
+
+    prob_tensor = np.zeros((n, 3, 9))
+
+    if n == 0:
+        return prob_tensor, np.zeros((n, 3)), np.zeros((n, 2))
+
+    combo_strength, hero_strength = both_strength_arrays(combos, flop, hand)
+    hands = np.broadcast_to(np.array(hand), (n, 2))
+
+    # can switch args to get stats for other person
+    if pov == 'opp':
+        with stage('villain pass'):
+            res = opp_stats_arrays(flop, combos, hands, *combo_strength, *hero_strength)
+    elif pov == 'hero':
+        with stage('hero pass'):
+            res = opp_stats_arrays(flop, hands, combos, *hero_strength, *combo_strength)
+
+    # flop row is just the current hand type
+    types = combo_strength[0] if pov == 'opp' else hero_strength[0]
+    prob_tensor[np.arange(n), 0, types] = 1
+    prob_tensor[:, 1], prob_tensor[:, 2], higher_pair_stats, is_draw_stats = res
+
+    assert np.allclose(prob_tensor.sum(axis = 2), 1, rtol = 1e-10), "range_prob_tensor: probs don't add up"
+
+    return prob_tensor, higher_pair_stats, is_draw_stats
+
+
+def range_both_tensors(combos, flop, hand):
+    """
+    range_prob_tensor for both pov's (hand strengths computed once for both)
+
+    Args:
+        combos: (N, 2) int array of opp's hands
+        flop (tuple(int)): e.g. parse_cards('QdTd5c')
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+
+    Returns:
+        opp_tensor: (N, 3, 9) villain's final_res_table of each combo
+        hero_tensor: (N, 3, 9) hero's final_res_table vs each combo
+        higher_pair_stats: (N, 3) array (villain's)
+        is_draw_stats: (N, 2) array (villain's)
+    """
+    n = len(combos)
+
+    opp_tensor = np.zeros((n, 3, 9))
+    hero_tensor = np.zeros((n, 3, 9))
+
+    if n == 0:
+        return opp_tensor, hero_tensor, np.zeros((n, 3)), np.zeros((n, 2))
+
+    combo_strength, hero_strength = both_strength_arrays(combos, flop, hand)
+    hands = np.broadcast_to(np.array(hand), (n, 2))
+
+    # flop row is just the current hand type
+    opp_tensor[np.arange(n), 0, combo_strength[0]] = 1
+    hero_tensor[np.arange(n), 0, hero_strength[0]] = 1
+
+    with stage('villain pass'):
+        opp_tensor[:, 1], opp_tensor[:, 2], higher_pair_stats, is_draw_stats = opp_stats_arrays(
+            flop, combos, hands, *combo_strength, *hero_strength)
+
+    with stage('hero pass'):
+        hero_tensor[:, 1], hero_tensor[:, 2], _, _ = opp_stats_arrays(flop, hands, combos, *hero_strength, *combo_strength)
+
+    assert np.allclose(opp_tensor.sum(axis = 2), 1, rtol = 1e-10), "range_both_tensors: opp probs don't add up"
+    assert np.allclose(hero_tensor.sum(axis = 2), 1, rtol = 1e-10), "range_both_tensors: hero probs don't add up"
+
+    return opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats
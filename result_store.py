@@ -0,0 +1,237 @@
+'''
+Persistent on-disk cache for main_function results
+
+One file holds a fixed number of slots (memory-mapped numpy records), so it is
+size-bounded and many processes can read it at the same time. A slot is:
+
+    key (16 bytes) | last_used (time) | main_function result packed in 61 floats
+
+The key is a hash of the canonical spot: suits relabeled (see spot_cache.py) by
+flop + hero hand, then the range is relabeled the same way and fingerprinted as
+a 52x52 bitmask. Keys are placed by open addressing over a small probe window;
+when the window is full, the least recently used slot is evicted.
+
+The file header has an engine version stamp (hash of the engine's source files).
+If the probability code changes, the stamp changes and the old file is replaced
+by an empty one.
+'''
+
+from spot_cache import suit_relabeling, relabel_cards
+from evaluator import table_version
+import hashlib
+import os
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # no file locks on Windows (single process use is still fine)
+    fcntl = None
+
+engine_files = ['cards.py', 'hand_strength.py', 'atom_funcs.py', 'static.py', 'draw_stats_prototype.py',
+                'evaluator.py', 'range_engine.py', 'outs_engine.py', 'runout_engine.py', 'prob_functions.py']
+
+store_magic = b'HRSTORE1'
+header_size = 64
+result_size = 61        # 1 + 1 + 27 + 27 + 3 + 2 (see pack_result)
+probe_window = 8
+
+record_dtype = np.dtype([('key', 'V16'), ('last_used', '<f8'), ('values', '<f8', (result_size,))])
+
+
+def engine_version():
+    """
+    Returns:
+        bytes (16): hash of the engine's source files (+ evaluator table version)
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(str(table_version).encode())
+
+    for name in engine_files:
+        with open(os.path.join(folder, name), 'rb') as f:
+            h.update(f.read())
+
+    return h.digest()
+
+
+def spot_key(r, flop, hand, method):
+    """
+    Args:
+        r: (N, 2) int array of villain's range (see range_to_array)
+        flop (tuple(int)), hand (tuple(int))
+        method (str): see main_function
+
+    Returns:
+        bytes (16): same for spots that only differ by suits
+    """
+    new_suit = suit_relabeling(flop, hand)
+    suit_map = np.array(new_suit, dtype = np.int64)
+
+    # relabel range, then fingerprint it as a 52x52 bitmask (order of combos doesn't matter)
+    combos = (r & ~3) | suit_map[r & 3]
+    combos = np.sort(combos, axis = 1)
+    mask = np.zeros(52 * 52, dtype = bool)
+    mask[combos[:, 0] * 52 + combos[:, 1]] = True
+
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(bytes(relabel_cards(flop, new_suit)))
+    h.update(bytes(relabel_cards(hand, new_suit)))
+    h.update(method.encode())
+    h.update(np.packbits(mask).tobytes())
+
+    return h.digest()
+
+
+def pack_result(result):
+    """main_function result --> (61,) float array (zero padded for turn/river boards)"""
+    hero_hand_type, result_opp, result_hero, opp_improve_probs, avg_is_draw_opp = result
+
+    values = np.concatenate([[hero_hand_type, len(result_opp)], np.ravel(result_opp), np.ravel(result_hero),
+                             np.ravel(opp_improve_probs), np.ravel(avg_is_draw_opp)])
+
+    return np.pad(values, (0, result_size - len(values)))
+
+
+def unpack_result(values):
+    """(61,) float array --> main_function result"""
+    values = np.array(values)
+    streets = int(values[1])
+    ends = np.cumsum([2, streets * 9, streets * 9, streets, 2])
+
+    return (int(values[0]), values[ends[0]: ends[1]].reshape(streets, 9), values[ends[1]: ends[2]].reshape(streets, 9),
+            values[ends[2]: ends[3]], values[ends[3]: ends[4]])
+
+
+class ResultStore:
+    """
+    Disk cache for main_function, e.g.
+
+        store = ResultStore('spots.cache')
+        main_function(r, 'QdTd5c', 'AdQc', store = store)
+    """
+
+    def __init__(self, path, capacity = 2 ** 14, version = None):
+        """
+        Args:
+            path (str): cache file (created if missing or stale)
+            capacity (int): max # of results (file is ~0.5KB per slot)
+            version (bytes): version stamp, defaults to engine_version()
+        """
+        self.path = path
+        self.capacity = capacity
+        self.version = engine_version() if version is None else version
+        self.hits = 0
+        self.misses = 0
+
+        if not self.header_ok():
+            self.create()
+
+        self.lock_file = open(path, 'rb')
+        self.records = np.memmap(path, dtype = record_dtype, mode = 'r+', offset = header_size, shape = (capacity,))
+
+    def header(self):
+        return store_magic + self.version + self.capacity.to_bytes(8, 'little')
+
+    def header_ok(self):
+        if not os.path.exists(self.path):
+            return False
+
+        expected_size = header_size + self.capacity * record_dtype.itemsize
+        with open(self.path, 'rb') as f:
+            head = f.read(header_size)
+
+        return head.startswith(self.header()) and os.path.getsize(self.path) == expected_size
+
+    def create(self):
+        """
+        Writes an empty store. Temp file + rename, so other processes either
+        see the old file or the new one (never a half-written one)
+        """
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.header().ljust(header_size, b'\0'))
+            f.truncate(header_size + self.capacity * record_dtype.itemsize)
+        os.replace(tmp_path, self.path)
+
+    def lock(self, exclusive):
+        if fcntl is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    def probe(self, key):
+        """Slots key can live in"""
+        start = int.from_bytes(key[:8], 'little') % self.capacity
+        return [(start + i) % self.capacity for i in range(min(probe_window, self.capacity))]
+
+    def find(self, key, slots):
+        for slot in slots:
+            if self.records['key'][slot].tobytes() == key:
+                return slot
+        return None
+
+    def get(self, key):
+        """
+        Returns:
+            main_function result, or None if key isn't stored
+        """
+        slots = self.probe(key)
+
+        self.lock(exclusive = False)
+        try:
+            slot = self.find(key, slots)
+            if slot is not None:
+                values = np.array(self.records['values'][slot])
+        finally:
+            self.unlock()
+
+        if slot is None:
+            self.misses += 1
+            return None
+
+        # LRU touch is a write: exclusive lock, and only if the slot wasn't evicted in between
+        self.lock(exclusive = True)
+        try:
+            if self.records['key'][slot].tobytes() == key:
+                self.records['last_used'][slot] = time.time()
+        finally:
+            self.unlock()
+
+        self.hits += 1
+        return unpack_result(values)
+
+    def put(self, key, result):
+        slots = self.probe(key)
+
+        self.lock(exclusive = True)
+        try:
+            slot = self.find(key, slots)
+
+            # empty slots have last_used = 0, so they go first, then least recently used
+            if slot is None:
+                slot = min(slots, key = lambda s: self.records['last_used'][s])
+
+            self.records['values'][slot] = pack_result(result)
+            self.records['last_used'][slot] = time.time()
+            self.records['key'][slot] = np.void(key)
+        finally:
+            self.unlock()
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, size (# of stored results), capacity
+        """
+        size = int(np.count_nonzero(self.records['last_used']))
+        return {'hits': self.hits, 'misses': self.misses, 'size': size, 'capacity': self.capacity}
+
+    def flush(self):
+        self.records.flush()
+
+    def close(self):
+        self.records.flush()
+        self.lock_file.close()
+        del self.records
@@ -0,0 +1,324 @@
+'''
+Exact turn/river runout enumeration (alternative to the closed-form outs math)
+
+For every villain combo, every turn card (45) and every turn + river pair (990)
+is scored with evaluator.py. Work is shared across the whole range:
+
+- the runout boards (flop + turn, flop + turn + river) are built once, as
+  rank counts + suit masks. A combo's hand is just board + 2 hole cards
+- hero's scores only depend on the runout, so they are computed once (47 + 1081)
+- ignoring suits, a combo is just its 2 ranks (max 91 different pairs), so
+  non-flush scores are looked up once per rank pair, not once per combo
+- combos only mask out the runouts that use their own cards
+
+Gives the same 3x9 category matrices as opp_stats (exact instead of approximated),
+plus true win/tie/lose probabilities vs hero on each street.
+
+river_tensors does the same for a turn board (1 card to come, 46 rivers), with
+2x9 matrices (turn, river), and showdown_tensors for a river board (1x9).
+'''
+
+from evaluator import *
+from cards import full_deck
+import itertools
+import numpy as np
+
+
+def runout_boards(flop, hand):
+    """
+    Args:
+        flop (tuple(int)), hand (tuple(int))
+
+    Returns:
+        deck: (47,) int array of cards not in flop/hand
+        river_pairs: (1081, 2) int array of indices into deck (turn + river cards)
+    """
+    deck = np.array(sorted(full_deck.difference(flop, hand)), dtype = np.int64)
+    river_pairs = np.array(list(itertools.combinations(range(len(deck)), 2)), dtype = np.int64)
+
+    return deck, river_pairs
+
+
+def rank_pair_scores(board_rc):
+    """
+    Non-flush scores of each runout board + any 2 hole card ranks
+
+    Args:
+        board_rc: (R, 13) rank counts of runout boards (flop + turn (+ river))
+
+    Returns:
+        (169, R) int array, row r1 * 13 + r2 (rank idx, r1 <= r2)
+    """
+    r1, r2 = np.triu_indices(13)
+    pair_rc = np.zeros((len(r1), 13), dtype = np.int64)
+    np.add.at(pair_rc, (np.arange(len(r1)), r1), 1)
+    np.add.at(pair_rc, (np.arange(len(r1)), r2), 1)
+
+    scores = np.zeros((169, len(board_rc)), dtype = np.int64)
+    scores[r1 * 13 + r2] = noflush_scores(board_rc[None] + pair_rc[:, None])
+
+    return scores
+
+
+def combo_scores(pair_scores, board_sm, combos):
+    """
+    Scores every combo on every runout board
+
+    Args:
+        pair_scores: (169, R) see rank_pair_scores
+        board_sm: (R, 4) suit masks of runout boards
+        combos: (N, 2) int array (sorted, so rank of 1st card <= rank of 2nd)
+
+    Returns:
+        (N, R) int array of scores
+    """
+    r1, r2 = combos[:, 0] // 4, combos[:, 1] // 4
+    s1, s2 = combos[:, 0] % 4, combos[:, 1] % 4
+    b1, b2 = rank_bits[r1], rank_bits[r2]
+
+    # non-flush: only depends on the 2 ranks
+    scores = pair_scores[r1 * 13 + r2]
+
+    # flush: board alone, or with the combo's card(s) of each suit
+    same_suit = s1 == s2
+    scores = np.maximum(scores, flush_scores(board_sm)[None])
+    scores = np.maximum(scores, flush_table[board_sm[:, s1].T | (b1 | np.where(same_suit, b2, 0))[:, None]])
+    scores = np.maximum(scores, flush_table[board_sm[:, s2].T | (b2 | np.where(same_suit, b1, 0))[:, None]])
+
+    return scores
+
+
+def category_hist(hand_types, valid):
+    """
+    Args:
+        hand_types: (N, R) int array (or (R,) shared by all rows)
+        valid: (N, R) bool array of runouts to count
+
+    Returns:
+        (N, 9) array of prob of each hand type over valid runouts
+    """
+    n = len(valid)
+    hand_types = np.broadcast_to(hand_types, valid.shape)
+    rows = np.broadcast_to(np.arange(n)[:, None], valid.shape)
+
+    counts = np.bincount((rows * 9 + hand_types).ravel(), weights = valid.ravel(), minlength = n * 9)
+    return counts.reshape(n, 9) / valid.sum(axis = 1, keepdims = True)
+
+
+def runout_tensors(combos, flop, hand, chunk_size = 128):
+    """
+    Exact per-combo stats for a whole (already filtered) range
+
+    Args:
+        combos: (N, 2) int array of villain hands
+        flop (tuple(int)): e.g. parse_cards('QdTd5c')
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+        chunk_size (int): combos scored at once (bounds memory)
+
+    Returns:
+        opp_tensor: (N, 3, 9) villain's hand type probs on flop/turn/river
+        hero_tensor: (N, 3, 9) hero's hand type probs on flop/turn/river (given each combo)
+        higher_pair_stats: (N, 3) prob villain is ahead of hero's current (flop) hand, -1 if hero has 2 pair+
+        is_draw_stats: (N, 2) 0/1 if villain has straight/flush draw
+        equity: (N, 3, 3) villain's [win, tie, lose] prob vs hero on flop/turn/river
+    """
+    n = len(combos)
+    deck, river_pairs = runout_boards(flop, hand)
+
+    deck_pos = np.full(52, -1, dtype = np.int64)
+    deck_pos[deck] = np.arange(len(deck))
+
+    # board-only counts (flop + runout)
+    flop_rc, flop_sm = hand_counts(np.array([flop]))
+    turn_rc, turn_sm = hand_counts(deck[:, None])
+    turn_rc, turn_sm = turn_rc + flop_rc, turn_sm | flop_sm
+    river_rc, river_sm = hand_counts(deck[river_pairs])
+    river_rc, river_sm = river_rc + flop_rc, river_sm | flop_sm
+
+    # hero (shared by all combos)
+    hero_rc, hero_sm = hand_counts(np.array([hand]))
+    hero_flop = score_from_counts(flop_rc + hero_rc, flop_sm | hero_sm)[0]
+    hero_turn = score_from_counts(turn_rc + hero_rc, turn_sm | hero_sm)
+    hero_river = score_from_counts(river_rc + hero_rc, river_sm | hero_sm)
+
+    hero_flop_type = hero_flop >> 20
+
+    # villain's non-flush scores by rank pair (shared by all combos)
+    flop_pair_scores = rank_pair_scores(flop_rc)
+    turn_pair_scores = rank_pair_scores(turn_rc)
+    river_pair_scores = rank_pair_scores(river_rc)
+
+    opp_tensor = np.zeros((n, 3, 9))
+    hero_tensor = np.zeros((n, 3, 9))
+    higher_pair_stats = np.zeros((n, 3))
+    is_draw_stats = np.zeros((n, 2))
+    equity = np.zeros((n, 3, 3))
+
+    hero_tensor[:, 0, hero_flop_type] = 1
+
+    for start in range(0, n, chunk_size):
+        chunk = combos[start: start + chunk_size]
+        out = slice(start, start + len(chunk))
+        m = len(chunk)
+
+        opp_flop = combo_scores(flop_pair_scores, flop_sm, chunk)[:, 0]
+        opp_turn = combo_scores(turn_pair_scores, turn_sm, chunk)
+        opp_river = combo_scores(river_pair_scores, river_sm, chunk)
+
+        # runouts can't use villain's cards
+        i1 = deck_pos[chunk[:, 0]][:, None]
+        i2 = deck_pos[chunk[:, 1]][:, None]
+        turn_idx = np.arange(len(deck))[None]
+        turn_valid = (turn_idx != i1) & (turn_idx != i2)
+        river_valid = ((river_pairs[:, 0][None] != i1) & (river_pairs[:, 0][None] != i2)
+                       & (river_pairs[:, 1][None] != i1) & (river_pairs[:, 1][None] != i2))
+
+        opp_flop_type = opp_flop >> 20
+        opp_turn_type = opp_turn >> 20
+        opp_river_type = opp_river >> 20
+
+        # hand type probs
+        opp_tensor[out, 0][np.arange(m), opp_flop_type] = 1
+        opp_tensor[out, 1] = category_hist(opp_turn_type, turn_valid)
+        opp_tensor[out, 2] = category_hist(opp_river_type, river_valid)
+
+        hero_tensor[out, 1] = category_hist(hero_turn >> 20, turn_valid)
+        hero_tensor[out, 2] = category_hist(hero_river >> 20, river_valid)
+
+        # showdown vs hero on each street
+        num_turns = turn_valid.sum(axis = 1)
+        num_rivers = river_valid.sum(axis = 1)
+
+        equity[out, 0, 0] = opp_flop > hero_flop
+        equity[out, 0, 1] = opp_flop == hero_flop
+        equity[out, 1, 0] = ((opp_turn > hero_turn) & turn_valid).sum(axis = 1) / num_turns
+        equity[out, 1, 1] = ((opp_turn == hero_turn) & turn_valid).sum(axis = 1) / num_turns
+        equity[out, 2, 0] = ((opp_river > hero_river) & river_valid).sum(axis = 1) / num_rivers
+        equity[out, 2, 1] = ((opp_river == hero_river) & river_valid).sum(axis = 1) / num_rivers
+        equity[out, :, 2] = 1 - equity[out, :, 0] - equity[out, :, 1]
+
+        # villain surpasses the hand hero has now (only used when hero has pair/nothing)
+        if hero_flop_type <= 1:
+            higher_pair_stats[out, 0] = opp_flop > hero_flop
+            higher_pair_stats[out, 1] = ((opp_turn > hero_flop) & turn_valid).sum(axis = 1) / num_turns
+            higher_pair_stats[out, 2] = ((opp_river > hero_flop) & river_valid).sum(axis = 1) / num_rivers
+        else:
+            higher_pair_stats[out] = -1
+
+        # draws: a turn card can make a straight/flush (or already made, same as opp_stats)
+        makes_straight = (((opp_turn_type == 4) | (opp_turn_type == 8)) & turn_valid).any(axis = 1)
+        makes_flush = (((opp_turn_type == 5) | (opp_turn_type == 8)) & turn_valid).any(axis = 1)
+        is_draw_stats[out, 0] = (opp_flop_type >= 4) | makes_straight
+        is_draw_stats[out, 1] = (opp_flop_type >= 5) | makes_flush
+
+    return opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats, equity
+
+
+def river_tensors(combos, board, hand):
+    """
+    runout_tensors for a turn board (flop + turn): only the river is left to come,
+    so every combo is just scored on the 46 river cards
+
+    Args:
+        combos: (N, 2) int array of villain hands
+        board (tuple(int)): flop + turn e.g. parse_cards('QdTd5c2s')
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+
+    Returns:
+        same as runout_tensors, with 2 streets (turn, river) instead of 3
+    """
+    n = len(combos)
+    deck = np.array(sorted(full_deck.difference(board, hand)), dtype = np.int64)
+
+    deck_pos = np.full(52, -1, dtype = np.int64)
+    deck_pos[deck] = np.arange(len(deck))
+
+    turn_rc, turn_sm = hand_counts(np.array([board]))
+    river_rc, river_sm = hand_counts(deck[:, None])
+    river_rc, river_sm = river_rc + turn_rc, river_sm | turn_sm
+
+    hero_rc, hero_sm = hand_counts(np.array([hand]))
+    hero_turn = score_from_counts(turn_rc + hero_rc, turn_sm | hero_sm)[0]
+    hero_river = score_from_counts(river_rc + hero_rc, river_sm | hero_sm)
+
+    hero_turn_type = hero_turn >> 20
+
+    opp_turn = combo_scores(rank_pair_scores(turn_rc), turn_sm, combos)[:, 0]
+    opp_river = combo_scores(rank_pair_scores(river_rc), river_sm, combos)
+
+    # rivers can't be villain's cards
+    river_idx = np.arange(len(deck))[None]
+    river_valid = (river_idx != deck_pos[combos[:, 0]][:, None]) & (river_idx != deck_pos[combos[:, 1]][:, None])
+    num_rivers = river_valid.sum(axis = 1)
+
+    opp_turn_type = opp_turn >> 20
+    opp_river_type = opp_river >> 20
+
+    opp_tensor = np.zeros((n, 2, 9))
+    hero_tensor = np.zeros((n, 2, 9))
+    higher_pair_stats = np.zeros((n, 2))
+    is_draw_stats = np.zeros((n, 2))
+    equity = np.zeros((n, 2, 3))
+
+    opp_tensor[np.arange(n), 0, opp_turn_type] = 1
+    opp_tensor[:, 1] = category_hist(opp_river_type, river_valid)
+
+    hero_tensor[:, 0, hero_turn_type] = 1
+    hero_tensor[:, 1] = category_hist(hero_river >> 20, river_valid)
+
+    equity[:, 0, 0] = opp_turn > hero_turn
+    equity[:, 0, 1] = opp_turn == hero_turn
+    equity[:, 1, 0] = ((opp_river > hero_river) & river_valid).sum(axis = 1) / num_rivers
+    equity[:, 1, 1] = ((opp_river == hero_river) & river_valid).sum(axis = 1) / num_rivers
+    equity[:, :, 2] = 1 - equity[:, :, 0] - equity[:, :, 1]
+
+    if hero_turn_type <= 1:
+        higher_pair_stats[:, 0] = opp_turn > hero_turn
+        higher_pair_stats[:, 1] = ((opp_river > hero_turn) & river_valid).sum(axis = 1) / num_rivers
+    else:
+        higher_pair_stats[:] = -1
+
+    makes_straight = (((opp_river_type == 4) | (opp_river_type == 8)) & river_valid).any(axis = 1)
+    makes_flush = (((opp_river_type == 5) | (opp_river_type == 8)) & river_valid).any(axis = 1)
+    is_draw_stats[:, 0] = (opp_turn_type >= 4) | makes_straight
+    is_draw_stats[:, 1] = (opp_turn_type >= 5) | makes_flush
+
+    return opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats, equity
+
+
+def showdown_tensors(combos, board, hand):
+    """
+    runout_tensors for a river board (nothing left to come): 1 street (river)
+
+    Args:
+        combos: (N, 2) int array of villain hands
+        board (tuple(int)): 5 cards e.g. parse_cards('QdTd5c2s9h')
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+    """
+    n = len(combos)
+    board_rc, board_sm = hand_counts(np.array([board]))
+    hero_rc, hero_sm = hand_counts(np.array([hand]))
+
+    hero_score = score_from_counts(board_rc + hero_rc, board_sm | hero_sm)[0]
+    opp_score = combo_scores(rank_pair_scores(board_rc), board_sm, combos)[:, 0]
+    opp_type = opp_score >> 20
+
+    opp_tensor = np.zeros((n, 1, 9))
+    hero_tensor = np.zeros((n, 1, 9))
+    opp_tensor[np.arange(n), 0, opp_type] = 1
+    hero_tensor[:, 0, hero_score >> 20] = 1
+
+    if hero_score >> 20 <= 1:
+        higher_pair_stats = (opp_score > hero_score)[:, None].astype(float)
+    else:
+        higher_pair_stats = np.full((n, 1), -1.)
+
+    # only made straights/flushes left (same as opp_stats)
+    is_draw_stats = np.stack([opp_type >= 4, opp_type >= 5], axis = 1).astype(float)
+
+    equity = np.zeros((n, 1, 3))
+    equity[:, 0, 0] = opp_score > hero_score
+    equity[:, 0, 1] = opp_score == hero_score
+    equity[:, 0, 2] = opp_score < hero_score
+
+    return opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats, equity
@@ -0,0 +1,253 @@
+'''
+Monte Carlo runout sampling (alternative to exact runout enumeration)
+
+Estimates the same range means as runout_engine's tensors (averaged over the
+range) from random turn/river runouts, for when an estimate at a known
+precision is enough (or to cross-check the other methods):
+
+    (result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp,
+     avg_equity, report) = sample_runouts(combos, flop, hand, target_error = 0.005, seed = 1)
+
+Each batch draws runouts for every villain combo at once (never using the
+combo's own cards), scores them in one vectorized pass and adds them to
+per-combo counts:
+
+- hero's scores only depend on the runout: looked up from a table of every
+  turn (and every turn + river pair), computed once
+- villain's next-street scores are computed once per combo (47 cards, shared
+  rank-pair tables as in runout_engine); only river hands are scored per sample
+- the board as it is now (street 0) and the draw flags don't depend on the
+  runout, so they are exact
+
+After each batch, every estimate's confidence interval is computed from the
+per-combo counts (every combo has the same # of samples, so the range mean is
+a mean of independent per-combo means). Sampling stops once the widest
+interval is within target_error (half-width), or after max_samples runouts.
+
+The same seed (and options) gives the same result.
+'''
+
+from runout_engine import *
+from statistics import NormalDist
+
+default_target_error = 0.005
+default_confidence = 0.95
+
+# runouts scored per batch (over all combos) / in total
+batch_size = 1 << 16
+default_max_samples = 1 << 22
+
+
+def runout_positions(rng, combo_pos, num_cards, deck_size, samples):
+    """
+    Random runouts for every combo at once
+
+    Args:
+        rng (np.random.Generator)
+        combo_pos: (N, 2) sorted positions of each combo's cards in the deck
+        num_cards (int): cards to come (1 or 2)
+        deck_size (int)
+        samples (int): runouts per combo
+
+    Returns:
+        (N, samples, num_cards) int array of deck positions: distinct, and never a combo's card
+    """
+    n = len(combo_pos)
+    picks = []
+
+    for k in range(num_cards):
+        # uniform over the deck_size - 2 - k cards left: skip earlier picks, smallest first
+        pos = rng.integers(0, deck_size - 2 - k, size = (n, samples))
+        if picks:
+            for prev in np.sort(np.stack(picks), axis = 0):
+                pos += pos >= prev
+        picks.append(pos)
+
+    res = np.stack(picks, axis = 2)
+
+    # then skip the combo's own cards
+    res += res >= combo_pos[:, 0, None, None]
+    res += res >= combo_pos[:, 1, None, None]
+
+    return res
+
+
+def half_widths(counts, samples, num_combos, z):
+    """
+    Confidence interval half-widths of range means of per-combo proportions
+
+    Args:
+        counts: (N, ...) per-combo hit counts out of samples each
+        samples (int), num_combos (int)
+        z (float): normal quantile of the confidence level
+
+    Returns:
+        (...) float array
+    """
+    # add-one smoothed, so a category no combo has hit yet doesn't count as certain
+    p = (counts + 1) / (samples + 2)
+    return z * np.sqrt((p * (1 - p)).sum(axis = 0) / samples) / num_combos
+
+
+def sample_runouts(combos, board, hand, target_error = default_target_error, confidence = default_confidence,
+                   seed = None, max_samples = default_max_samples, progress = None):
+    """
+    Monte Carlo version of runout_tensors/river_tensors, averaged over the range
+
+    Args:
+        combos: (N, 2) int array of villain hands (sorted, none on board/hand)
+        board (tuple(int)): flop or turn board e.g. parse_cards('QdTd5c')
+                            (a river board has nothing to sample: exact showdown)
+        hand (tuple(int)): hero's hand e.g. parse_cards('AdQc')
+        target_error (float): stop once every estimate's CI half-width is within this
+        confidence (float): CI confidence level
+        seed: np.random.default_rng seed (None: different every call)
+        max_samples (int): cap on runouts over all combos (stops unconverged)
+        progress (callable): progress(samples, max_samples) after each batch.
+                             Raising from it cancels sampling
+
+    Returns:
+        result_opp, result_hero (np.array): (S, 9) hand type probs per street (S = 3 on a flop)
+        avg_higher_pair_opp (np.array): (S,) prob villain surpasses hero's current hand (-1 if hero has 2 pair+)
+        avg_is_draw_opp (np.array): (2,) prob villain has straight/flush draw
+        avg_equity (np.array): (S, 3) villain's [win, tie, lose] prob vs hero
+        report (dict): samples (runouts per combo), total_samples, error (widest CI half-width),
+                       errors (half-widths of each estimate above, 0 where exact),
+                       converged, target_error, confidence, seed
+    """
+    n = len(combos)
+    num_cards = 5 - len(board)
+    num_streets = num_cards + 1
+
+    if num_cards == 0:
+        opp_tensor, hero_tensor, higher_pair_stats, is_draw_stats, equity = showdown_tensors(combos, board, hand)
+        means = (opp_tensor.mean(axis = 0), hero_tensor.mean(axis = 0), higher_pair_stats.mean(axis = 0),
+                 is_draw_stats.mean(axis = 0), equity.mean(axis = 0))
+        errors = {'result_opp': np.zeros((1, 9)), 'result_hero': np.zeros((1, 9)),
+                  'higher_pair': np.zeros(1), 'equity': np.zeros((1, 3))}
+        report = {'samples': 0, 'total_samples': 0, 'error': 0.0, 'errors': errors, 'converged': True,
+                  'target_error': target_error, 'confidence': confidence, 'seed': seed}
+        return means + (report,)
+
+    rng = np.random.default_rng(seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    deck = np.array(sorted(full_deck.difference(board, hand)), dtype = np.int64)
+    deck_size = len(deck)
+
+    deck_pos = np.full(52, -1, dtype = np.int64)
+    deck_pos[deck] = np.arange(deck_size)
+    combo_pos = np.sort(deck_pos[combos], axis = 1)
+
+    board_rc, board_sm = hand_counts(np.array([board]))
+    hero_rc, hero_sm = hand_counts(np.array([hand]))
+
+    # now (exact)
+    hero_now = score_from_counts(board_rc + hero_rc, board_sm | hero_sm)[0]
+    opp_now = combo_scores(rank_pair_scores(board_rc), board_sm, combos)[:, 0]
+    hero_now_type = hero_now >> 20
+
+    # next card (every one, shared by all samples)
+    next_rc, next_sm = hand_counts(deck[:, None])
+    next_rc, next_sm = next_rc + board_rc, next_sm | board_sm
+    hero_next = score_from_counts(next_rc + hero_rc, next_sm | hero_sm)
+    opp_next = combo_scores(rank_pair_scores(next_rc), next_sm, combos)
+
+    if num_cards == 2:
+        # hero on every turn + river pair, villain's hole cards + board (river hands add the runout)
+        i, j = np.triu_indices(deck_size, 1)
+        river_rc, river_sm = hand_counts(np.stack([deck[i], deck[j]], axis = 1))
+        hero_river = np.zeros((deck_size, deck_size), dtype = np.int64)
+        hero_river[i, j] = hero_river[j, i] = score_from_counts(river_rc + board_rc + hero_rc, river_sm | board_sm | hero_sm)
+
+        opp_rc, opp_sm = hand_counts(combos)
+        opp_rc, opp_sm = opp_rc + board_rc, opp_sm | board_sm
+
+    # draws: some next card makes a straight/flush (or already made, same as runout_tensors)
+    next_idx = np.arange(deck_size)[None]
+    next_valid = (next_idx != combo_pos[:, :1]) & (next_idx != combo_pos[:, 1:])
+    opp_now_type = opp_now >> 20
+    opp_next_type = opp_next >> 20
+
+    makes_straight = (((opp_next_type == 4) | (opp_next_type == 8)) & next_valid).any(axis = 1)
+    makes_flush = (((opp_next_type == 5) | (opp_next_type == 8)) & next_valid).any(axis = 1)
+    avg_is_draw_opp = np.array([((opp_now_type >= 4) | makes_straight).mean(), ((opp_now_type >= 5) | makes_flush).mean()])
+
+    # per-combo counts, one column per street to come
+    opp_counts = np.zeros((n, num_cards, 9), dtype = np.int64)
+    hero_counts = np.zeros((n, num_cards, 9), dtype = np.int64)
+    outcome_counts = np.zeros((n, num_cards, 3), dtype = np.int64)
+    higher_counts = np.zeros((n, num_cards), dtype = np.int64)
+
+    rows = np.arange(n)[:, None]
+    samples_per_batch = max(1, batch_size // n)
+    samples = 0
+
+    while True:
+        pos = runout_positions(rng, combo_pos, num_cards, deck_size, samples_per_batch)
+
+        opp_scores = [opp_next[rows, pos[:, :, 0]]]
+        hero_scores = [hero_next[pos[:, :, 0]]]
+
+        if num_cards == 2:
+            runout_rc, runout_sm = hand_counts(deck[pos].reshape(-1, 2))
+            runout_rc = runout_rc.reshape(n, samples_per_batch, 13) + opp_rc[:, None]
+            runout_sm = runout_sm.reshape(n, samples_per_batch, 4) | opp_sm[:, None]
+
+            opp_scores.append(score_from_counts(runout_rc, runout_sm))
+            hero_scores.append(hero_river[pos[:, :, 0], pos[:, :, 1]])
+
+        for street, (opp, hero) in enumerate(zip(opp_scores, hero_scores)):
+            opp_counts[:, street] += np.bincount((rows * 9 + (opp >> 20)).ravel(), minlength = n * 9).reshape(n, 9)
+            hero_counts[:, street] += np.bincount((rows * 9 + (hero >> 20)).ravel(), minlength = n * 9).reshape(n, 9)
+
+            outcome_counts[:, street, 0] += (opp > hero).sum(axis = 1)
+            outcome_counts[:, street, 1] += (opp == hero).sum(axis = 1)
+            higher_counts[:, street] += (opp > hero_now).sum(axis = 1)
+
+        samples += samples_per_batch
+        outcome_counts[:, :, 2] = samples - outcome_counts[:, :, 0] - outcome_counts[:, :, 1]
+
+        opp_errors = half_widths(opp_counts, samples, n, z)
+        hero_errors = half_widths(hero_counts, samples, n, z)
+        equity_errors = half_widths(outcome_counts, samples, n, z)
+        # (only reported when hero has a pair or nothing)
+        higher_errors = half_widths(higher_counts, samples, n, z) if hero_now_type <= 1 else np.zeros(num_cards)
+
+        error = float(max(opp_errors.max(), hero_errors.max(), equity_errors.max(), higher_errors.max()))
+
+        if progress is not None:
+            progress(samples * n, max_samples)
+
+        if error <= target_error or (samples + samples_per_batch) * n > max_samples:
+            break
+
+    total = samples * n
+
+    result_opp = np.zeros((num_streets, 9))
+    result_opp[0] = np.bincount(opp_now_type, minlength = 9) / n
+    result_opp[1:] = opp_counts.sum(axis = 0) / total
+
+    result_hero = np.zeros((num_streets, 9))
+    result_hero[0, hero_now_type] = 1
+    result_hero[1:] = hero_counts.sum(axis = 0) / total
+
+    avg_equity = np.zeros((num_streets, 3))
+    avg_equity[0] = [(opp_now > hero_now).mean(), (opp_now == hero_now).mean(), (opp_now < hero_now).mean()]
+    avg_equity[1:] = outcome_counts.sum(axis = 0) / total
+
+    if hero_now_type <= 1:
+        avg_higher_pair_opp = np.concatenate([[(opp_now > hero_now).mean()], higher_counts.sum(axis = 0) / total])
+    else:
+        avg_higher_pair_opp = np.full(num_streets, -1.)
+
+    errors = {'result_opp': np.vstack([np.zeros(9), opp_errors]),
+              'result_hero': np.vstack([np.zeros(9), hero_errors]),
+              'higher_pair': np.concatenate([[0.], higher_errors]),
+              'equity': np.vstack([np.zeros(3), equity_errors])}
+
+    report = {'samples': samples, 'total_samples': total, 'error': error, 'errors': errors,
+              'converged': error <= target_error, 'target_error': target_error, 'confidence': confidence,
+              'seed': seed}
+
+    return result_opp, result_hero, avg_higher_pair_opp, avg_is_draw_opp, avg_equity, report
@@ -0,0 +1,239 @@
+'''
+Local HTTP/JSON service for main_function (standard library only)
+
+    python server.py --port 8765 --workers 8
+
+Endpoints:
+    POST /evaluate   one spot, or {"spots": [...], "method": "outs"} for a batch.
+                     Spots look like batch.py's input:
+                     {"id": "s1", "hand": "AdQc", "flop": "QdTd5c", "range": "QQ+,AKs"}
+                     Results look like batch.py's output (in request order)
+    GET  /stats      request count, spots, rejects, latency percentiles
+    GET  /health
+
+Spots are evaluated on a pool of worker processes that is started (and warmed
+up: tables loaded, pokerkit imported) with the server. At most max_pending spots
+are queued at once; requests that would go over get 503 + Retry-After
+instead of piling up. Every response reports its latency (latency_ms field and
+X-Latency-Ms header).
+'''
+
+from batch import evaluate_spots, spots_per_task
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+default_port = 8765
+default_max_pending = 4096
+max_body_bytes = 16 * 1024 * 1024
+latency_window = 1000
+
+
+def warm_worker():
+    """Pool initializer: runs 1 spot so tables, pokerkit and caches are loaded before the first request"""
+    evaluate_spots([{'id': 0, 'hand': 'AdQc', 'flop': 'QdTd5c', 'range': 'AA'}])
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class EvaluationService:
+    """Warm worker pool + backpressure + latency stats (shared by all request threads)"""
+
+    def __init__(self, workers = None, max_pending = default_max_pending, cache_path = None):
+        self.workers = workers or os.cpu_count()
+        self.max_pending = max_pending
+        self.cache_path = cache_path
+        self.pool = ProcessPoolExecutor(max_workers = self.workers, initializer = warm_worker)
+
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.requests = 0
+        self.spots = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen = latency_window)
+
+        # start every worker now rather than on the first request
+        for future in [self.pool.submit(os.getpid) for i in range(self.workers)]:
+            future.result()
+
+    def evaluate(self, spots, method = 'outs'):
+        """
+        Returns:
+            list(dict): results in the same order as spots
+
+        Raises:
+            ServiceBusy: if max_pending spots are already queued
+        """
+        with self.lock:
+            if self.pending + len(spots) > self.max_pending:
+                self.rejected += 1
+                raise ServiceBusy()
+            self.pending += len(spots)
+
+        try:
+            futures = [self.pool.submit(evaluate_spots, spots[i: i + spots_per_task], method, self.cache_path)
+                       for i in range(0, len(spots), spots_per_task)]
+            return [res for future in futures for res in future.result()]
+        finally:
+            with self.lock:
+                self.pending -= len(spots)
+
+    def record(self, num_spots, latency_ms):
+        with self.lock:
+            self.requests += 1
+            self.spots += num_spots
+            self.latencies.append(latency_ms)
+
+    def stats(self):
+        with self.lock:
+            latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+            return {
+                'requests': self.requests,
+                'spots': self.spots,
+                'rejected': self.rejected,
+                'pending': self.pending,
+                'workers': self.workers,
+                'latency_ms': {'p50': float(np.percentile(latencies, 50)),
+                               'p90': float(np.percentile(latencies, 90)),
+                               'p99': float(np.percentile(latencies, 99)),
+                               'max': float(latencies.max())},
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures = True)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # set by make_server
+    service = None
+    quiet = False
+
+    def send_json(self, status, body, latency_ms = None, headers = {}):
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if latency_ms is not None:
+            self.send_header('X-Latency-Ms', f'{latency_ms:.2f}')
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self.send_json(200, self.service.stats())
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+
+        if self.path != '/evaluate':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > max_body_bytes:
+            self.send_json(413, {'error': f'Request body over {max_body_bytes} bytes'})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError as e:
+            self.send_json(400, {'error': f'Invalid JSON: {e}'})
+            return
+
+        # one spot, or a batch
+        is_batch = isinstance(body, dict) and 'spots' in body
+        spots = body['spots'] if is_batch else [body]
+        method = body.get('method', 'outs') if isinstance(body, dict) else 'outs'
+
+        if not isinstance(spots, list) or not all(isinstance(spot, dict) for spot in spots):
+            self.send_json(400, {'error': 'Expected a spot object or {"spots": [...]}'})
+            return
+        if len(spots) > self.service.max_pending:
+            self.send_json(413, {'error': f'Batch over {self.service.max_pending} spots (max pending), split it up'})
+            return
+        if method not in ('outs', 'exact'):
+            self.send_json(400, {'error': "method must be 'outs' or 'exact'"})
+            return
+
+        # same fields as batch.read_spots
+        spots = [{'id': spot.get('id', i), 'hand': str(spot.get('hand') or '').strip(),
+                  'flop': str(spot.get('flop') or '').strip(), 'range': str(spot.get('range') or '').strip()}
+                 for i, spot in enumerate(spots, start = 1)]
+
+        try:
+            results = self.service.evaluate(spots, method)
+        except ServiceBusy:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.send_json(503, {'error': 'Server busy, try again later'}, latency_ms, {'Retry-After': '1'})
+            return
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.service.record(len(spots), latency_ms)
+
+        if is_batch:
+            self.send_json(200, {'results': results, 'latency_ms': latency_ms}, latency_ms)
+        else:
+            self.send_json(200, dict(results[0], latency_ms = latency_ms), latency_ms)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host = '127.0.0.1', port = default_port, workers = None, max_pending = default_max_pending,
+                cache_path = None, quiet = False):
+    """
+    Returns:
+        ThreadingHTTPServer (call serve_forever()), with .service (EvaluationService)
+    """
+    service = EvaluationService(workers, max_pending, cache_path)
+    handler = type('Handler', (RequestHandler,), {'service': service, 'quiet': quiet})
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.service = service
+    return server
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Local HTTP/JSON service for main_function')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = default_port)
+    parser.add_argument('--workers', type = int, default = None, help = 'worker processes (default: # of cores)')
+    parser.add_argument('--max-pending', type = int, default = default_max_pending,
+                        help = 'max spots queued before requests get 503')
+    parser.add_argument('--cache', help = 'on-disk result cache file (see result_store.py)')
+    parser.add_argument('--quiet', action = 'store_true', help = 'no per-request log lines')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.max_pending, args.cache, args.quiet)
+    print(f'Serving on http://{args.host}:{args.port} with {server.service.workers} workers', file = sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
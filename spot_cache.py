@@ -0,0 +1,34 @@
+'''
+Suit isomorphism
+
+Spots that only differ by a relabeling of suits (e.g. AhKh/Qh7s2d vs AsKs/Qs7h2c)
+have identical stats. suit_relabeling relabels suits into one canonical form,
+so isomorphic spots share a key (see result_store.py, flop_db.py).
+'''
+
+def suit_relabeling(*card_groups):
+    """
+    Canonical relabeling of suits for groups of cards (e.g. flop, hand, opp_hand)
+
+    Each suit gets a signature (the ranks it has in each group). Suits are
+    renumbered in order of signature. Suits with equal signatures are
+    interchangeable, so ties don't matter
+
+    Returns:
+        list(int): new_suit[old suit]
+    """
+    signatures = [tuple([] for cards in card_groups) for s in range(4)]
+    for i, cards in enumerate(card_groups):
+        for c in sorted(cards):
+            signatures[c & 3][i].append(c >> 2)
+
+    new_suit = [0] * 4
+    for i, s in enumerate(sorted(range(4), key = lambda s: signatures[s])):
+        new_suit[s] = i
+
+    return new_suit
+
+
+def relabel_cards(cards, new_suit):
+    """Applies suit relabeling (see suit_relabeling), returns sorted tuple"""
+    return tuple(sorted((c & ~3) | new_suit[c & 3] for c in cards))
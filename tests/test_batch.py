@@ -0,0 +1,54 @@
+import io
+
+from batch import read_spots, evaluate_spot, run_batch
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+        self.f = io.StringIO()
+
+    def write(self, res):
+        self.rows.append(res)
+
+
+def spots_of(text, fmt = 'jsonl'):
+    return list(read_spots(io.StringIO(text), fmt))
+
+
+def test_malformed_jsonl_rows_are_per_spot_errors():
+    text = '\n'.join([
+        'not json',
+        '[1, 2]',
+        '{"id": "a", "hand": 123, "flop": "QdTd5c", "range": "AKs"}',
+        '{"id": "b", "hand": "AdQc", "flop": "QdTd5c", "range": ["AA"]}',
+        '{"id": "c", "hand": "AdQc", "flop": "QdTd5c", "range": "AKs"}',
+    ])
+    spots = spots_of(text)
+
+    assert [spot['id'] for spot in spots] == [1, 2, 'a', 'b', 'c']
+    assert spots[0]['error'].startswith('Invalid JSON')
+    assert spots[1]['error'] == 'Expected a JSON object'
+
+    results = [evaluate_spot(spot) for spot in spots]
+    assert all('error' in res for res in results[:4])
+    assert 'error' not in results[4]
+
+
+def test_malformed_row_does_not_abort_run():
+    spots = spots_of('{"hand": {"x": 1}, "flop": 5, "range": null}\n{"hand": "AdQc", "flop": "QdTd5c", "range": "AKs"}\n')
+
+    writer = ListWriter()
+    summary = run_batch(iter(spots), writer, workers = 1)
+    rows = writer.rows
+
+    assert summary['spots'] == 2 and summary['errors'] == 1
+    assert 'error' in rows[0] and 'error' not in rows[1]
+
+
+def test_ids():
+    spots = spots_of('{"id": 0, "hand": "AdQc"}\n{"id": "", "hand": "AdQc"}\n{"hand": "AdQc"}\n')
+    assert [spot['id'] for spot in spots] == [0, 2, 3]
+
+    spots = spots_of('id,hand,flop,range\n,AdQc,QdTd5c,AKs\nx,AdQc,QdTd5c,AKs\n', 'csv')
+    assert [spot['id'] for spot in spots] == [1, 'x']
@@ -0,0 +1,65 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from cards import parse_cards
+from combo_range import Range
+from outs_engine import opp_stats
+from prob_functions import filter_range
+from range_engine import range_to_array, range_prob_tensor, range_both_tensors
+
+data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+spots = [('QdTd5c', 'AdQc'), ('7h8h2c', 'AsKs'), ('9h9c5h', 'Ts9s'), ('AsAdAc', 'KhQh'), ('5c4c3d', '6d6h')]
+range_str = '22+,A2s+,K9s+,QTs+,J9s+,T8s+,97s+,86s+,75s+,64s+,54s,ATo+,KJo+,QJo'
+
+
+def reference_spots():
+    with open(os.path.join(data_dir, 'opp_stats_reference.json')) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('ref', reference_spots())
+def test_opp_stats_matches_reference(ref):
+    """Reference values were computed with the old per-combo (scalar) outs code"""
+    final_res_table, higher_pair_stats, is_draw_stats = opp_stats(
+        tuple(ref['flop']), tuple(ref['hand']), tuple(ref['opp_hand']), tuple(ref['dead_cards']))
+
+    assert np.allclose(final_res_table, ref['final_res_table'], rtol = 0, atol = 1e-12)
+    assert np.allclose(higher_pair_stats, ref['higher_pair_stats'], rtol = 0, atol = 1e-12)
+    assert np.array_equal(is_draw_stats, ref['is_draw_stats'])
+
+
+@pytest.mark.parametrize('flop_str, hand_str', spots)
+def test_range_tensors_match_opp_stats(flop_str, hand_str):
+    flop, hand = parse_cards(flop_str), parse_cards(hand_str)
+    combos = filter_range(range_to_array(Range.from_str(range_str)), flop, hand)
+
+    opp_tensor, higher_pair_stats, is_draw_stats = range_prob_tensor(combos, flop, hand)
+    hero_tensor, _, _ = range_prob_tensor(combos, flop, hand, 'hero')
+
+    for i, combo in enumerate(combos.tolist()):
+        final_res_table, higher, draws = opp_stats(flop, hand, tuple(combo))
+        assert np.array_equal(opp_tensor[i], final_res_table)
+        assert np.array_equal(higher_pair_stats[i], higher)
+        assert np.array_equal(is_draw_stats[i], draws)
+
+        # hero's stats vs combo = opp_stats with the hands switched
+        assert np.array_equal(hero_tensor[i], opp_stats(flop, tuple(combo), hand)[0])
+
+    both = range_both_tensors(combos, flop, hand)
+    assert np.array_equal(both[0], opp_tensor)
+    assert np.array_equal(both[1], hero_tensor)
+    assert np.array_equal(both[2], higher_pair_stats)
+    assert np.array_equal(both[3], is_draw_stats)
+
+
+def test_empty_range():
+    flop, hand = parse_cards('QdTd5c'), parse_cards('AdQc')
+    prob_tensor, higher_pair_stats, is_draw_stats = range_prob_tensor(np.zeros((0, 2), dtype = np.int64), flop, hand)
+
+    assert prob_tensor.shape == (0, 3, 9)
+    assert higher_pair_stats.shape == (0, 3)
+    assert is_draw_stats.shape == (0, 2)
@@ -0,0 +1,51 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from cards import card_str, full_deck, parse_cards
+from runout_engine import runout_tensors
+
+pokerkit = pytest.importorskip('pokerkit')
+
+hand_labels = list(pokerkit.Label)
+
+
+def best_hand(cards):
+    return pokerkit.StandardHighHand.from_game(''.join(card_str[c] for c in cards))
+
+
+def brute_force(combo, flop, hand):
+    """Hand type probs of villain/hero on flop/turn/river + villain's river [win, tie, lose], with pokerkit"""
+    deck = sorted(full_deck.difference(flop, hand, combo))
+    opp_probs, hero_probs = np.zeros((3, 9)), np.zeros((3, 9))
+    equity = np.zeros(3)
+
+    streets = [[()], [(c,) for c in deck], list(itertools.combinations(deck, 2))]
+    for street, runouts in enumerate(streets):
+        for runout in runouts:
+            opp_hand, hero_hand = best_hand(combo + flop + runout), best_hand(hand + flop + runout)
+            opp_probs[street, hand_labels.index(opp_hand.entry.label)] += 1 / len(runouts)
+            hero_probs[street, hand_labels.index(hero_hand.entry.label)] += 1 / len(runouts)
+
+            if street == 2:
+                equity += np.array([opp_hand > hero_hand, opp_hand == hero_hand, opp_hand < hero_hand]) / len(runouts)
+
+    return opp_probs, hero_probs, equity
+
+
+@pytest.mark.parametrize('flop_str, hand_str, combo_strs', [
+    ('QdTd5c', 'AdQc', ['KdJd', '9d8d', 'TcTh']),
+    ('7h8h2c', 'AsKs', ['9h6h', '8c7c']),
+])
+def test_runout_tensors_match_pokerkit(flop_str, hand_str, combo_strs):
+    flop, hand = parse_cards(flop_str), parse_cards(hand_str)
+    combos = np.array([sorted(parse_cards(s)) for s in combo_strs])
+
+    opp_tensor, hero_tensor, _, _, equity = runout_tensors(combos, flop, hand)
+
+    for i, combo in enumerate(combos.tolist()):
+        opp_probs, hero_probs, river_equity = brute_force(tuple(combo), flop, hand)
+        assert np.allclose(opp_tensor[i], opp_probs)
+        assert np.allclose(hero_tensor[i], hero_probs)
+        assert np.allclose(equity[i, 2], river_equity)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from cards import parse_cards
+from combo_range import Range
+from prob_functions import filter_range, range_vs_hand_runouts
+from range_engine import range_to_array
+from sampling_engine import sample_runouts
+
+target_error = 0.01
+
+
+@pytest.mark.parametrize('board_str, hand_str, range_str', [
+    ('QdTd5c', 'AdQc', 'QQ+,AKs,T9s,A5s+,KQo'),
+    ('QdTd5c2s', 'AdQc', 'QQ+,AKs,T9s,A5s+,KQo'),
+])
+def test_seeded_sampling(board_str, hand_str, range_str):
+    board, hand = parse_cards(board_str), parse_cards(hand_str)
+    r = range_to_array(Range.from_str(range_str))
+    combos = filter_range(r, board, hand)
+
+    *means, report = sample_runouts(combos, board, hand, target_error = target_error, seed = 1)
+    *means_again, _ = sample_runouts(combos, board, hand, target_error = target_error, seed = 1)
+
+    # same seed --> same results
+    for a, b in zip(means, means_again):
+        assert np.array_equal(a, b)
+
+    assert report['converged']
+    assert report['error'] <= target_error
+
+    # estimates are within target_error of the exact values (draws are exact either way)
+    exact = range_vs_hand_runouts(r, board, hand)
+    for a, b in zip(means, exact):
+        assert np.abs(np.asarray(a) - np.asarray(b)).max() <= target_error
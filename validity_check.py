@@ -1,4 +1,5 @@
-from prob_functions import *
+from atom_funcs import get_cards_str
+from collections import Counter
 
 valid_ranks = {'A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2'}
 valid_suits = {'h', 'd', 's', 'c'}
@@ -26,24 +27,22 @@ def is_valid_hand(s, ranks = valid_ranks, suits = valid_suits):
     return True, "Success"
 
 def is_valid_flop(s, ranks = valid_ranks, suits = valid_suits):
-    # must have 4 chars
-    if len(s) != 6:
-        return False, "Flop: Please enter 3 cards"
+    # flop (6 chars), flop + turn (8) or flop + turn + river (10)
+    if len(s) not in (6, 8, 10):
+        return False, "Flop: Please enter 3 to 5 cards"
 
-    r1, r2, r3 = s[0], s[2], s[4]
-    s1, s2, s3 = s[1], s[3], s[5]
+    board_ranks = s[0::2]
+    board_suits = s[1::2]
 
-    if (r1 not in ranks) or (r2 not in ranks) or (r3 not in ranks):
+    if any(r not in ranks for r in board_ranks):
         return False, "Flop: Invalid rank"
 
-    if (s1 not in suits) or (s2 not in suits) or (s3 not in suits):
+    if any(c not in suits for c in board_suits):
         return False, "Flop: Invalid suit"
     
-    c1 = s[:2]
-    c2 = s[2:4]
-    c3 = s[4:]
+    cards = [s[i: i + 2] for i in range(0, len(s), 2)]
 
-    if len({c1, c2, c3}) != 3:
+    if len(set(cards)) != len(cards):
         return False, "Please do not enter duplicate flop cards"
 
     return True, "Success"